@@ -0,0 +1,155 @@
+"""Micro-benchmarks for the vectorized cleaning and display formatting paths.
+
+Each case builds a synthetic raw frame, times the dashboard function on it and,
+for sizes up to --reference-max, checks the output against the original
+row-at-a-time implementation kept below.
+
+    python benchmarks/bench_cleaning.py --sizes 10000 100000 1000000 --output bench.json
+    python benchmarks/bench_cleaning.py --baseline bench.json --tolerance 1.5
+"""
+import argparse
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import measure, report_regressions, write_results
+from breach_dashboard import cleaning
+
+# Row-wise reference implementations, as they were before vectorization
+
+def reference_clean_washington(df):
+    data = []
+    for _, row in df.iterrows():
+        entry = {}
+        if 'Organization Name' in row:
+            entry['entity_name'] = str(row['Organization Name']).replace('Organization Name ', '')
+        if 'Date Reported' in row:
+            date_reported = str(row['Date Reported']).replace('Date Reported ', '')
+            entry['date_reported'] = pd.to_datetime(date_reported, errors='coerce')
+        if 'Number of Washingtonians Affected' in row:
+            wa_affected = str(row['Number of Washingtonians Affected'])
+            wa_affected = wa_affected.replace('Number of Washingtonians Affected ', '')
+            entry['state_residents_affected'] = pd.to_numeric(wa_affected, errors='coerce')
+        entry['source_link'] = 'https://www.atg.wa.gov/data-breach-notifications'
+        entry['reporting_state_agency'] = 'WA'
+        entry['total_affected'] = np.nan
+        data.append(entry)
+    return pd.DataFrame(data)
+
+def reference_hawaii_dates(series):
+    return series.apply(
+        lambda x: pd.to_datetime(str(x).replace('.', '/'), errors='coerce', format='%Y/%m/%d')
+        if isinstance(x, str) else pd.NaT
+    )
+
+def reference_parse_counts(series):
+    return series.apply(
+        lambda x: pd.to_numeric(re.sub(r'[^\d.]', '', str(x)) if str(x).strip() else np.nan,
+                                errors='coerce')
+    )
+
+def reference_format_counts(series):
+    return series.apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A")
+
+# Synthetic inputs
+
+def synthetic_washington(rows, rng):
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    counts = rng.integers(1, 2_000_000, rows).astype(str).astype(object)
+    counts[rng.random(rows) < 0.05] = 'Unknown'
+    return pd.DataFrame({
+        'Organization Name': 'Organization Name Entity ' + pd.Series(rng.integers(0, rows, rows)).astype(str),
+        'Date Reported': 'Date Reported ' + pd.Series(dates.strftime('%m/%d/%Y')),
+        'Number of Washingtonians Affected': 'Number of Washingtonians Affected ' + pd.Series(counts),
+    })
+
+def synthetic_hawaii_dates(rows, rng):
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    values = pd.Series(dates.strftime('%Y.%m.%d'), dtype=object)
+    values[rng.random(rows) < 0.05] = np.nan
+    return values
+
+def synthetic_count_text(rows, rng):
+    values = pd.Series(rng.integers(1, 5_000_000, rows), dtype=object).map('{:,}'.format)
+    values[rng.random(rows) < 0.1] = ''
+    values[rng.random(rows) < 0.1] = np.nan
+    return values.astype(object)
+
+def synthetic_counts(rows, rng):
+    values = rng.integers(1, 5_000_000, rows).astype(float)
+    values[rng.random(rows) < 0.3] = np.nan
+    return pd.Series(values)
+
+def build_cases():
+    """(name, input builder, dashboard function, reference function, comparison)"""
+    def compare_frames(left, right):
+        pd.testing.assert_frame_equal(left, right)
+
+    def compare_series(left, right):
+        pd.testing.assert_series_equal(left, right, check_dtype=False, check_names=False)
+
+    def hawaii_dates(series):
+        frame = pd.DataFrame({'Date Notified': series, 'Hawaii Residents Impacted': np.nan})
+        return cleaning.clean_hawaii_data(frame)['date_reported']
+
+    return [
+        ('clean_washington_data', synthetic_washington, cleaning.clean_washington_data,
+         reference_clean_washington, compare_frames),
+        ('clean_hawaii_data.dates', synthetic_hawaii_dates, hawaii_dates,
+         reference_hawaii_dates, compare_series),
+        ('final_cleaning.parse_counts', synthetic_count_text, cleaning.parse_counts,
+         reference_parse_counts, compare_series),
+        ('main.format_counts', synthetic_counts, cleaning.format_counts,
+         reference_format_counts, compare_series),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--reference-max', type=int, default=10_000,
+                        help='largest size to also run and compare against the row-wise code')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    failed = False
+
+    for name, build_input, func, reference, compare in build_cases():
+        for rows in args.sizes:
+            data = build_input(rows, rng)
+            output, seconds, cpu, peak = measure(func, data, repeat=args.repeat)
+            result = {'name': name, 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu, 'peak_bytes': peak}
+
+            if rows <= args.reference_max:
+                expected, ref_seconds, _, _ = measure(reference, data, repeat=1, track_memory=False)
+                result['reference_seconds'] = ref_seconds
+                try:
+                    compare(expected, output)
+                    result['matches_reference'] = True
+                except AssertionError as e:
+                    result['matches_reference'] = False
+                    failed = True
+                    print(f"{name} at {rows} rows differs from the row-wise output:\n{e}", file=sys.stderr)
+
+            results.append(result)
+            speedup = ''
+            if 'reference_seconds' in result:
+                speedup = f"  (row-wise {result['reference_seconds']:.3f}s, {result['reference_seconds'] / seconds:.0f}x)"
+            print(f"{name:32} {rows:>9,} rows  {seconds:8.3f}s  peak {peak / 2**20:7.1f} MiB{speedup}")
+
+    if args.output:
+        write_results(args.output, {'benchmark': 'cleaning', 'results': results})
+
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance):
+        failed = True
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Benchmark for cross-source incident matching on synthetic reports.
+
+Builds synthetic breaches, each reported to one to four different agencies
+under varied names (case, punctuation, legal suffixes, a dropped letter) and
+dates a few days apart, then times assign_incidents() and scores the grouping
+against the truth.
+
+    python benchmarks/bench_dedup.py --sizes 25000 50000 100000 200000 --output dedup.json
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import measure, report_regressions, write_results
+from breach_dashboard.incidents import assign_incidents
+
+WORDS = (
+    'acme', 'summit', 'river', 'valley', 'health', 'medical', 'dental', 'capital', 'national',
+    'first', 'pacific', 'northern', 'global', 'united', 'family', 'care', 'partners', 'systems',
+    'solutions', 'financial', 'bank', 'credit', 'union', 'school', 'district', 'county', 'city',
+    'insurance', 'group', 'services', 'clinic', 'hospital', 'pharmacy', 'labs', 'logistics',
+)
+SUFFIXES = ('', ' Inc.', ' Inc', ', LLC', ' L.L.C.', ' Corp', ' Corporation', ' Co.', ' Ltd')
+AGENCIES = ('ME', 'TX', 'WA', 'HI', 'CA', 'HHS')
+
+def synthetic_reports(rows, rng):
+    """Return (reports, true incident number per report)"""
+    incidents = max(1, rows // 2)
+    reports_per_incident = rng.integers(1, 5, incidents)
+    reports_per_incident[-1] += max(0, rows - reports_per_incident.sum())
+    incident_of = np.repeat(np.arange(incidents), reports_per_incident)[:rows]
+
+    # Base names get a serial token so different incidents rarely share a name by chance
+    word_picks = rng.integers(0, len(WORDS), (incidents, 3))
+    serials = rng.integers(0, 10 * incidents, incidents)
+    base_names = np.array([
+        f"{WORDS[a]} {WORDS[b]} {WORDS[c]} {serial:x}"
+        for (a, b, c), serial in zip(word_picks, serials)
+    ], dtype=object)
+    base_dates = pd.Timestamp('2018-01-01') + pd.to_timedelta(rng.integers(0, 2500, incidents), unit='D')
+
+    names = []
+    for name, case, suffix, drop in zip(
+            base_names[incident_of], rng.integers(0, 3, rows),
+            rng.integers(0, len(SUFFIXES), rows), rng.random(rows) < 0.1):
+        if drop:
+            name = name[:-1] if name[-1] != ' ' else name
+        name = name.title() if case == 0 else name.upper() if case == 1 else name
+        names.append(name + SUFFIXES[suffix])
+
+    # An agency gets one report per breach
+    first_report = np.repeat(np.cumsum(reports_per_incident) - reports_per_incident, reports_per_incident)[:rows]
+    agency_order = np.argsort(rng.random((incidents, len(AGENCIES))), axis=1)
+    agencies = agency_order[incident_of, (np.arange(rows) - first_report) % len(AGENCIES)]
+
+    reports = pd.DataFrame({
+        'entity_name': names,
+        'date_reported': base_dates[incident_of] + pd.to_timedelta(rng.integers(0, 10, rows), unit='D'),
+        'reporting_state_agency': np.array(AGENCIES)[agencies],
+        'total_affected': rng.integers(1, 1_000_000, rows).astype(float),
+        'state_residents_affected': np.nan,
+        'source_link': 'https://example.test/',
+    })
+    return reports, incident_of
+
+def score(predicted, truth):
+    """Share of true incidents recovered exactly, and share of predicted incidents that are pure"""
+    pairs = pd.DataFrame({'predicted': predicted, 'truth': truth})
+    pure = pairs.groupby('predicted')['truth'].nunique().eq(1)
+    by_truth = pairs.groupby('truth')['predicted']
+    exact = by_truth.nunique().eq(1) & pure.reindex(by_truth.first()).to_numpy()
+    return exact.mean(), pure.mean()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25_000, 50_000, 100_000, 200_000])
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+
+    for rows in args.sizes:
+        reports, truth = synthetic_reports(rows, rng)
+        assigned, seconds, cpu, peak = measure(assign_incidents, reports, repeat=args.repeat)
+        recall, purity = score(assigned['incident_id'].to_numpy(), truth)
+        results.append({
+            'name': 'assign_incidents', 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu,
+            'peak_bytes': peak, 'incidents_found': int(assigned['incident_id'].nunique()),
+            'incidents_true': int(len(np.unique(truth))), 'exact_recall': recall, 'purity': purity,
+        })
+        print(f"assign_incidents {rows:>9,} rows  {seconds:8.3f}s  {seconds / rows * 1e6:6.1f} us/row  "
+              f"peak {peak / 2**20:7.1f} MiB  exact {recall:.3f}  pure {purity:.3f}")
+
+    if args.output:
+        write_results(args.output, {'benchmark': 'dedup', 'results': results})
+
+    failed = False
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance):
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Memory per column of the combined breach frame before and after compaction.
+
+    python benchmarks/bench_memory.py --rows 500000 --output memory.json
+"""
+import argparse
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import write_results
+from breach_dashboard.cleaning import compact_breach_frame, memory_report
+
+SOURCE_LINKS = {
+    'TX': 'https://oag.my.site.com/datasecuritybreachreport/apex/DataSecurityReportsPage',
+    'WA': 'https://www.atg.wa.gov/data-breach-notifications',
+    'CA': 'https://oag.ca.gov/privacy/databreach/list',
+    'HHS': 'https://ocrportal.hhs.gov/ocr/breach/breach_report.jsf',
+}
+
+def synthetic_combined(rows, rng):
+    """A combined frame shaped like full history: few agencies, repeated links and names, sparse counts"""
+    agencies = np.array(['ME', 'TX', 'WA', 'HI', 'CA', 'HHS'])[rng.integers(0, 6, rows)]
+    links = pd.Series(agencies).map(SOURCE_LINKS)
+    maine = agencies == 'ME'
+    links[maine] = [f"https://www.maine.gov/agviewer/content/ag/985235c7/{i:08x}.shtml" for i in range(maine.sum())]
+    total = rng.integers(1, 5_000_000, rows).astype(float)
+    total[rng.random(rows) < 0.6] = np.nan
+    residents = rng.integers(1, 100_000, rows).astype(float)
+    residents[rng.random(rows) < 0.5] = np.nan
+    return pd.DataFrame({
+        'entity_name': pd.Series(rng.integers(0, rows // 3, rows)).map('Entity {:06d} Holdings Inc'.format).astype(object),
+        'total_affected': total,
+        'state_residents_affected': residents,
+        'date_reported': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 5000, rows), unit='D'),
+        'reporting_state_agency': pd.Series(agencies, dtype=object),
+        'source_link': links.astype(object),
+    })
+
+def pickle_seconds(df):
+    """Round-trip time through pickle, which is what a st.cache_data hit costs"""
+    started = time.perf_counter()
+    pickle.loads(pickle.dumps(df))
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--output', help='write the report to this JSON file')
+    args = parser.parse_args()
+
+    before = synthetic_combined(args.rows, np.random.default_rng(0))
+    after = compact_breach_frame(before)
+    report = memory_report(before, after)
+
+    print(report.to_string(formatters={'before': '{:,.0f}'.format, 'after': '{:,.0f}'.format}))
+    print(f"pickle round trip: {pickle_seconds(before):.3f}s before, {pickle_seconds(after):.3f}s after")
+
+    if args.output:
+        write_results(args.output, {
+            'benchmark': 'memory', 'rows': args.rows,
+            'columns': report.reset_index(names='column').to_dict(orient='records'),
+        })
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
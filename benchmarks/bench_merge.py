@@ -0,0 +1,87 @@
+"""Benchmark of merging new rows into the cleaned dataset against cleaning everything again.
+
+Builds a cleaned history of each size, then times merge_cleaned() on a fixed
+batch of new rows (some repeating stored reports) and final_cleaning() on
+history plus batch. Each merge is checked against the full recompute: the
+same reports must survive, each with as few missing values, newest first.
+
+    python benchmarks/bench_merge.py --sizes 100000 1000000 --delta 500 --output merge.json
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench_memory import synthetic_combined
+from common import measure, report_regressions, write_results
+from breach_dashboard.cleaning import DEDUP_KEYS, final_cleaning, merge_cleaned
+
+def new_reports(history, rows, rng):
+    """Fresh reports, plus re-sent copies of stored ones with some counts filled in or blanked"""
+    fresh = synthetic_combined(rows, rng)
+    resent = history.sample(max(1, rows // 10), random_state=0).copy()
+    resent['total_affected'] = np.where(rng.random(len(resent)) < 0.5, np.nan, rng.integers(1, 5_000_000, len(resent)))
+    return pd.concat([fresh, resent], ignore_index=True)
+
+def summary(df):
+    """Each surviving report's key and missing-value count, in a fixed order"""
+    keys = df[DEDUP_KEYS].assign(missing=df.isna().sum(axis=1).to_numpy())
+    keys['entity_name'] = keys['entity_name'].astype(object)
+    return keys.sort_values(DEDUP_KEYS).reset_index(drop=True)
+
+def matches_full(merged, full):
+    try:
+        pd.testing.assert_frame_equal(summary(merged), summary(full), check_dtype=False)
+    except AssertionError:
+        return False
+    dates = merged['date_reported']
+    return bool(dates.dropna().is_monotonic_decreasing and dates.iloc[dates.notna().sum():].isna().all())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--delta', type=int, default=500, help='new rows per refresh')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    failed = False
+
+    for rows in args.sizes:
+        history = synthetic_combined(rows, rng)
+        cleaned = final_cleaning(history)
+        delta = new_reports(history, args.delta, rng)
+
+        (merged, changes), seconds, cpu, peak = measure(merge_cleaned, cleaned, delta, repeat=args.repeat)
+        full, full_seconds, full_cpu, full_peak = measure(
+            final_cleaning, pd.concat([history, delta], ignore_index=True), repeat=args.repeat)
+        matches = matches_full(merged, full)
+        failed |= not matches
+        counts = changes['change'].value_counts()
+
+        results.append({
+            'name': 'merge_cleaned', 'rows': rows, 'delta_rows': len(delta), 'seconds': seconds,
+            'cpu_seconds': cpu, 'peak_bytes': peak, 'added': int(counts.get('added', 0)),
+            'changed': int(counts.get('changed', 0)), 'matches_full': matches,
+        })
+        results.append({'name': 'final_cleaning', 'rows': rows, 'delta_rows': len(delta), 'seconds': full_seconds,
+                        'cpu_seconds': full_cpu, 'peak_bytes': full_peak})
+        print(f"{rows:>9,} rows + {len(delta):,}  merge {seconds:7.3f}s  peak {peak / 2**20:7.1f} MiB  "
+              f"full {full_seconds:7.3f}s  peak {full_peak / 2**20:7.1f} MiB  "
+              f"added {counts.get('added', 0):,} changed {counts.get('changed', 0):,}"
+              f"{'' if matches else '  MISMATCH'}")
+
+    if args.output:
+        write_results(args.output, {'benchmark': 'merge', 'results': results})
+
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance):
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Offline benchmark of the whole collection pipeline against a local stand-in server.
+
+Serves synthetic (or recorded) copies of every source page from 127.0.0.1,
+points the loaders at it, and reports wall time, CPU time and peak traced
+memory for each stage: fetch, table parsing, each clean_* function,
+final_cleaning, incident matching and compaction. It then times a cold and a
+warm end-to-end refresh of all sources, and one after new reports appear on
+the HHS portal, which should page only as far as the reports already stored.
+The cold run keeps the production Maine rate limit, so it takes at least
+--maine-reports / 10 seconds.
+
+Texas only renders its full table in a browser, so it is read over HTTP from
+the stand-in unless --browser is given.
+
+    python benchmarks/bench_pipeline.py --rows 5000 --maine-reports 500 --output pipeline.json
+    python benchmarks/bench_pipeline.py --recorded-dir fixtures/ --baseline pipeline.json
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import measure, report_regressions, write_results
+from fixtures import PAGE_PATHS, build_site, hhs_reports
+from standin_server import StandInServer
+
+# DATA_DIR is read when the package is imported, so keep the benchmark away from the real data store first
+BENCH_DATA_DIR = tempfile.mkdtemp(prefix='breach-bench-')
+os.environ['BREACH_DATA_DIR'] = BENCH_DATA_DIR
+
+from breach_dashboard import cleaning, fetching, incidents, metrics, pipeline, sources, tables  # noqa: E402
+
+def fetch_maine(list_url):
+    session = fetching.make_http_session()
+    urls = sources.maine_report_urls(sources.fetch_source_page(list_url, session=session), list_url)
+    pages, errors = fetching.fetch_pages(urls, session=session, max_workers=sources.MAINE_FETCH_WORKERS)
+    if errors:
+        raise RuntimeError(f"{len(errors)} Maine reports failed to fetch")
+    return [(url, pages[url]) for url in urls]
+
+def fetch_hhs(url):
+    """Every report on the portal, read page by page through its pager"""
+    pager = sources.HHSResultPager(fetching.make_http_session(), url)
+    records = list(pager.first_page)
+    while len(records) < pager.total:
+        records += pager.read(len(records), sources.HHS_PAGE_SIZE)
+    return records
+
+def parse_maine(pages):
+    return sources.build_maine_frame([sources.parse_maine_detail(html, url) for url, html in pages])
+
+def parse_table(name, html):
+    if name == 'TX':
+        return sources.parse_texas_table(html)
+    return tables.extract_table(html, **sources.SOURCE_TABLES[name])
+
+def source_stages(server, args):
+    """Time fetch, parse and clean for each source on its own; return (results, cleaned frames)"""
+    results = []
+    cleaned = []
+
+    def run(name, stage, rows, func, *func_args):
+        output, seconds, cpu, peak = measure(func, *func_args, repeat=args.repeat)
+        results.append({'name': f'{name}.{stage}', 'rows': rows, 'seconds': seconds,
+                        'cpu_seconds': cpu, 'peak_bytes': peak})
+        print(f"{name + '.' + stage:28} {rows:>9,} rows  {seconds:8.3f}s  cpu {cpu:8.3f}s  "
+              f"peak {peak / 2**20:7.1f} MiB")
+        return output
+
+    for name, path in PAGE_PATHS.items():
+        url = server.url(path)
+        if name == 'ME':
+            pages = run(name, 'fetch', args.maine_reports, fetch_maine, url)
+            raw = run(name, 'parse', args.maine_reports, parse_maine, pages)
+        elif name == 'HHS':
+            # The pager parses each page as it arrives
+            raw = pd.DataFrame(run(name, 'fetch', args.rows, fetch_hhs, url))
+        else:
+            html = run(name, 'fetch', args.rows, sources.fetch_source_page, url)
+            raw = run(name, 'parse', args.rows, parse_table, name, html)
+        cleaner = pipeline.BREACH_CLEANERS[name]
+        cleaned.append(run(name, cleaner.__name__, len(raw), cleaner, raw))
+    return results, cleaned
+
+def combine_stages(cleaned, args):
+    """Time the steps that turn the cleaned source frames into the stored dataset"""
+    results = []
+    combined = pd.concat(cleaned, ignore_index=True)
+    rows = len(combined)
+    stages = [
+        ('final_cleaning', cleaning.final_cleaning),
+        ('assign_incidents', incidents.assign_incidents),
+        ('compact_breach_frame', cleaning.compact_breach_frame),
+    ]
+    frame = combined
+    for name, func in stages:
+        frame, seconds, cpu, peak = measure(func, frame, repeat=args.repeat)
+        results.append({'name': name, 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu, 'peak_bytes': peak})
+        print(f"{name:28} {rows:>9,} rows  {seconds:8.3f}s  cpu {cpu:8.3f}s  peak {peak / 2**20:7.1f} MiB")
+    return results
+
+def end_to_end():
+    """Refresh every source and combine them, as the dashboard does"""
+    changed = pipeline.refresh_sources()
+    return changed, pipeline.combine_cleaned_sources(incremental=True)
+
+def end_to_end_stages(args, hhs_portal):
+    """Time a cold refresh into the empty data directory, a warm one where nothing changed, then new HHS reports"""
+    results = []
+    for stage in ('cold', 'warm', 'new_hhs_reports'):
+        if stage == 'new_hhs_reports':
+            hhs_portal.add(hhs_reports(args.new_hhs_reports, np.random.default_rng(1)))
+        rows_served = hhs_portal.rows_served
+        # Each run reuses the state of the one before, so none can be repeated
+        (changed, combined), seconds, cpu, _ = measure(end_to_end, repeat=1, track_memory=False)
+        name = f'end_to_end.{stage}'
+        results.append({'name': name, 'rows': len(combined), 'seconds': seconds, 'cpu_seconds': cpu,
+                        'changed_sources': changed, 'hhs_rows_served': hhs_portal.rows_served - rows_served})
+        print(f"{name:28} {len(combined):>9,} rows  {seconds:8.3f}s  cpu {cpu:8.3f}s  "
+              f"changed {','.join(changed) or '-'}  HHS rows served {results[-1]['hhs_rows_served']:,}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000, help='rows in each synthetic source table')
+    parser.add_argument('--maine-reports', type=int, default=500, help='Maine detail pages to serve')
+    parser.add_argument('--new-hhs-reports', type=int, default=25, help='reports to add to the HHS portal last')
+    parser.add_argument('--recorded-dir', help='directory of recorded <SOURCE>.html pages to serve instead')
+    parser.add_argument('--browser', action='store_true', help='load Texas through the browser as in production')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    try:
+        site = build_site(args.rows, args.maine_reports, np.random.default_rng(0), args.recorded_dir)
+
+        with StandInServer(site) as server:
+            sources.SOURCE_URLS.update({name: server.url(path) for name, path in PAGE_PATHS.items()})
+            if not args.browser:
+                pipeline.BREACH_SOURCES['TX'] = lambda deadline=None: sources.parse_texas_table(
+                    sources.fetch_source_page(sources.SOURCE_URLS['TX'], source='TX', deadline=deadline))
+
+            results, cleaned = source_stages(server, args)
+            results += combine_stages(cleaned, args)
+            results += end_to_end_stages(args, site[PAGE_PATHS['HHS']])
+            print(f"stand-in server answered {server.requests:,} requests")
+    finally:
+        shutil.rmtree(BENCH_DATA_DIR, ignore_errors=True)
+
+    if args.output:
+        write_results(args.output, {
+            'benchmark': 'pipeline',
+            'rows': args.rows,
+            'maine_reports': args.maine_reports,
+            'recorded_dir': args.recorded_dir,
+            'results': results,
+            'metrics': metrics.METRICS.snapshot(),
+        })
+
+    failed = False
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance):
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Benchmark of the indexed query layer against boolean masks over the whole frame.
+
+Builds a BreachIndex over a synthetic multi-year frame, then times date-range,
+agency and entity-name queries plus taking one page. Each query is checked
+against the mask-and-copy filtering the dashboard used before.
+
+    python benchmarks/bench_query.py --sizes 100000 1000000 --output query.json
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench_memory import synthetic_combined
+from common import measure, report_regressions, write_results
+from breach_dashboard.cleaning import compact_breach_frame
+from breach_dashboard.query import BreachIndex
+
+# (name, query keyword arguments)
+QUERIES = [
+    ('two_weeks', {'start': '2023-09-01', 'end': '2023-09-15'}),
+    ('one_year_two_agencies', {'start': '2022-01-01', 'end': '2023-01-01', 'agencies': ['TX', 'HHS']}),
+    ('all_years_substring', {'text': '00123'}),
+    ('all_years_prefix', {'text': 'entity 0012', 'prefix': True}),
+    ('short_substring', {'text': '99'}),
+]
+
+def reference_query(df, start=None, end=None, agencies=None, text=None, prefix=False):
+    """Row positions from boolean masks over the whole frame, newest first"""
+    mask = df['date_reported'].notna()
+    if start is not None:
+        mask &= df['date_reported'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['date_reported'] < pd.Timestamp(end)
+    if agencies:
+        mask &= df['reporting_state_agency'].isin(agencies)
+    if text:
+        names = df['entity_name'].astype(object).str.casefold()
+        mask &= names.str.startswith(text) if prefix else names.str.contains(text, regex=False)
+    filtered = df[mask].copy()
+    return filtered.sort_values('date_reported', ascending=False, kind='stable').index.to_numpy()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    failed = False
+
+    for rows in args.sizes:
+        df = compact_breach_frame(synthetic_combined(rows, rng))
+        index, seconds, cpu, peak = measure(BreachIndex, df, repeat=1)
+        results.append({'name': 'build', 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu, 'peak_bytes': peak})
+        print(f"{'build':24} {rows:>9,} rows  {seconds:8.3f}s  peak {peak / 2**20:7.1f} MiB")
+
+        for name, kwargs in QUERIES:
+            found, seconds, cpu, peak = measure(index.query, repeat=args.repeat, **kwargs)
+            _, page_seconds, _, _ = measure(index.page, found, 1, 50, repeat=args.repeat, track_memory=False)
+            expected, ref_seconds, _, _ = measure(reference_query, df, repeat=1, track_memory=False, **kwargs)
+            # Rows with the same date may come back in either order
+            matches = np.array_equal(np.sort(found), np.sort(expected))
+            failed |= not matches
+            results.append({
+                'name': name, 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu, 'peak_bytes': peak,
+                'page_seconds': page_seconds, 'reference_seconds': ref_seconds, 'matches': int(len(found)),
+                'matches_reference': matches,
+            })
+            print(f"{name:24} {rows:>9,} rows  {seconds * 1e3:8.2f}ms  page {page_seconds * 1e3:6.2f}ms  "
+                  f"{len(found):>8,} hits  (masks {ref_seconds * 1e3:8.1f}ms){'' if matches else '  MISMATCH'}")
+
+    if args.output:
+        write_results(args.output, {'benchmark': 'query', 'results': results})
+
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance, digits=4):
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
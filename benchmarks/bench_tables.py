@@ -0,0 +1,105 @@
+"""Benchmark of targeted table extraction against pd.read_html on whole pages.
+
+Builds each source's synthetic page at several sizes, then times
+extract_table() and the pd.read_html call the loaders used before, and checks
+that both give the same frame. Peak memory is reported twice: traced Python
+allocations, and the growth in peak RSS of a fresh child process running the
+parse once, which also counts the lxml tree that tracemalloc cannot see.
+
+    python benchmarks/bench_tables.py --sizes 1000 10000 50000 --output tables.json
+"""
+import argparse
+import multiprocessing
+import sys
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from common import measure, report_regressions, write_results
+from fixtures import TABLE_PAGES
+from breach_dashboard.sources import SOURCE_TABLES
+from breach_dashboard.tables import extract_table
+
+# Which table of each page pd.read_html returned to the loaders
+READ_HTML_INDEX = {'HHS': 1, 'TX': 0, 'WA': 0, 'HI': 0, 'CA': 0}
+
+def read_html_table(name, html):
+    return pd.read_html(StringIO(html), flavor='lxml')[READ_HTML_INDEX[name]]
+
+def targeted_table(name, html):
+    return extract_table(html, **SOURCE_TABLES[name])
+
+def _status_kib(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+def _child_peak_rss(func, args, queue):
+    # Touch the page first so only the parse counts
+    len(args[1].encode('utf-8'))
+    # Writing 5 to clear_refs resets the peak RSS (VmHWM) to the current RSS
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    before = _status_kib('VmRSS')
+    func(*args)
+    queue.put(_status_kib('VmHWM') - before)
+
+def peak_rss_growth(func, *args):
+    """Bytes the peak RSS of a fresh child process grows by while running func once (Linux only)"""
+    # A spawned child starts with a clean heap, so it cannot reuse memory this process has freed
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    child = context.Process(target=_child_peak_rss, args=(func, args, queue))
+    child.start()
+    growth = queue.get()
+    child.join()
+    return growth * 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--sources', nargs='+', choices=list(TABLE_PAGES), default=list(TABLE_PAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='fail if slower than this earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    failed = False
+
+    for name in args.sources:
+        for rows in args.sizes:
+            html = TABLE_PAGES[name](rows, rng)
+            frames = {}
+            for parser_name, func in (('extract_table', targeted_table), ('read_html', read_html_table)):
+                frame, seconds, cpu, peak = measure(func, name, html, repeat=args.repeat)
+                frames[parser_name] = frame
+                results.append({
+                    'name': f'{name}.{parser_name}', 'rows': rows, 'seconds': seconds, 'cpu_seconds': cpu,
+                    'peak_bytes': peak, 'peak_rss_growth': peak_rss_growth(func, name, html),
+                    'page_bytes': len(html.encode('utf-8')),
+                })
+                print(f"{name + '.' + parser_name:20} {rows:>9,} rows  {seconds:8.3f}s  "
+                      f"peak {peak / 2**20:7.1f} MiB  rss +{results[-1]['peak_rss_growth'] / 2**20:7.1f} MiB")
+
+            try:
+                pd.testing.assert_frame_equal(frames['extract_table'], frames['read_html'])
+                results[-2]['matches_read_html'] = True
+            except AssertionError as e:
+                results[-2]['matches_read_html'] = False
+                failed = True
+                print(f"{name} at {rows} rows differs from pd.read_html:\n{e}", file=sys.stderr)
+
+    if args.output:
+        write_results(args.output, {'benchmark': 'tables', 'results': results})
+
+    if args.baseline and report_regressions(results, args.baseline, args.tolerance):
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Shared helpers for the benchmark scripts"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the breach_dashboard package importable when running a script from benchmarks/
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+def measure(func, *args, repeat=3, track_memory=True, **kwargs):
+    """Run func a few times; return (result, best wall seconds, cpu seconds of that run, peak traced bytes)"""
+    best = None
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        if best is None or wall < best[1]:
+            best = (result, wall, cpu)
+    
+    # tracemalloc slows allocations down, so memory gets its own run
+    peak = None
+    if track_memory:
+        tracemalloc.start()
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best + (peak,)
+
+def write_results(path, results):
+    """Save benchmark results as JSON so runs can be compared"""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+def check_baseline(results, baseline_path, tolerance):
+    """Return the results that are more than `tolerance` times slower than the saved baseline"""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['rows']): r for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['name'], result['rows']))
+        if previous and result['seconds'] > previous['seconds'] * tolerance:
+            regressions.append((result, previous))
+    return regressions
+
+def report_regressions(results, baseline_path, tolerance, digits=3):
+    """Print each result more than `tolerance` times slower than the baseline; return True if there were any"""
+    regressions = check_baseline(results, baseline_path, tolerance)
+    for result, previous in regressions:
+        print(f"{result['name']} at {result['rows']} rows regressed: "
+              f"{result['seconds']:.{digits}f}s vs {previous['seconds']:.{digits}f}s", file=sys.stderr)
+    return bool(regressions)
@@ -0,0 +1,246 @@
+"""Synthetic (or recorded) copies of the source pages, scaled to any number of rows"""
+import html
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+ENTITY_WORDS = (
+    'Acme', 'Summit', 'River', 'Valley', 'Health', 'Medical', 'Dental', 'Capital', 'National',
+    'First', 'Pacific', 'Northern', 'Global', 'United', 'Family', 'Care', 'Partners', 'Systems',
+)
+
+# Page paths on the stand-in server, and the table each loader reads from them
+PAGE_PATHS = {
+    'ME': '/agviewer/content/ag/985235c7-cb95-4be2-8792-a1252b4f8318/list.html',
+    'HHS': '/ocr/breach/breach_report.jsf',
+    'TX': '/datasecuritybreachreport/apex/DataSecurityReportsPage',
+    'WA': '/data-breach-notifications',
+    'HI': '/ocp/notices/security-breach/',
+    'CA': '/privacy/databreach/list',
+}
+MAINE_REPORT_DIR = '/agviewer/content/ag/985235c7-cb95-4be2-8792-a1252b4f8318/reports/'
+
+def _entity_names(rows, rng):
+    picks = rng.integers(0, len(ENTITY_WORDS), (rows, 2))
+    serials = rng.integers(0, 50 * rows, rows)
+    return [f"{ENTITY_WORDS[a]} {ENTITY_WORDS[b]} {serial:x} Inc." for (a, b), serial in zip(picks, serials)]
+
+def _dates(rows, rng, fmt):
+    days = pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    return (pd.Timestamp('2015-01-01') + days).strftime(fmt)
+
+def _table(headers, rows, attrs=''):
+    head = ''.join(f'<th>{html.escape(h)}</th>' for h in headers)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row) + '</tr>'
+        for row in rows
+    )
+    return f'<table {attrs}><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+def _page(title, *tables):
+    return (f'<html><head><title>{title}</title></head><body><div id="content">'
+            f'<h1>{title}</h1>{"".join(tables)}</div></body></html>')
+
+def maine_pages(rows, rng):
+    """The Maine list page plus one detail page per report"""
+    pages = {}
+    names = _entity_names(rows, rng)
+    notified = _dates(rows, rng, '%m/%d/%Y')
+    links = []
+    for i in range(rows):
+        path = f"{MAINE_REPORT_DIR}{i:08d}-3f9c2b1e-7d4a-4c8e-9b1f-{i:012x}.shtml"
+        links.append(f'<li><a href="{path}">{html.escape(names[i])}</a></li>')
+        pages[path] = _page('Breach Report', (
+            '<ul>'
+            f'<li>Entity Name: {html.escape(names[i])}</li>'
+            f'<li>Street Address: {i} Main Street</li>'
+            '<li>City: Augusta</li>'
+            '<li>State, or Country if outside the US: ME</li>'
+            f'<li>Total number of persons affected (including residents): {rng.integers(1, 500000)}</li>'
+            f'<li>Total number of Maine residents affected: {rng.integers(1, 5000)}</li>'
+            f'<li>Date(s) of consumer notification: {notified[i]}</li>'
+            '</ul>'
+        ))
+    pages[PAGE_PATHS['ME']] = _page('Data Breach Notifications', '<ul>' + ''.join(links) + '</ul>')
+    return pages
+
+def hhs_page(rows, rng):
+    search_form = _table(['Search'], [['Filter results']])
+    reports = _table(
+        ['Name of Covered Entity', 'State', 'Covered Entity Type', 'Individuals Affected',
+         'Breach Submission Date', 'Type of Breach', 'Location of Breached Information'],
+        zip(_entity_names(rows, rng), np.full(rows, 'TX'), np.full(rows, 'Healthcare Provider'),
+            rng.integers(500, 1_000_000, rows), _dates(rows, rng, '%m/%d/%Y'),
+            np.full(rows, 'Hacking/IT Incident'), np.full(rows, 'Network Server')),
+    )
+    return _page('Breach Portal', search_form, reports)
+
+HHS_COLUMNS = [
+    'Name of Covered Entity', 'State', 'Covered Entity Type', 'Individuals Affected',
+    'Breach Submission Date', 'Type of Breach', 'Location of Breached Information',
+]
+
+def hhs_reports(rows, rng):
+    """HHS report rows, newest submission first as the portal lists them"""
+    dates = pd.to_datetime(_dates(rows, rng, '%m/%d/%Y'), format='%m/%d/%Y').sort_values(ascending=False)
+    return [list(row) for row in zip(
+        _entity_names(rows, rng), np.full(rows, 'TX'), np.full(rows, 'Healthcare Provider'),
+        rng.integers(500, 1_000_000, rows).tolist(), dates.strftime('%m/%d/%Y'),
+        np.full(rows, 'Hacking/IT Incident'), np.full(rows, 'Network Server'))]
+
+class HHSPortal:
+    """Stand-in for the HHS breach portal: a JSF form whose PrimeFaces result table pages through POSTs.
+
+    Each GET starts a view with a fresh view state; a partial POST carrying a
+    known view state gets the rows asked for, anything else a ViewExpiredException.
+    Like PrimeFaces, a request for rows past the end gets the last page again.
+    Without widget_script the page leaves out the table's widget script, and
+    with it the row count.
+    """
+
+    TABLE_ID = 'ocrForm:reportResultTable'
+    PAGE_ROWS = 100
+
+    def __init__(self, reports, widget_script=True):
+        self.reports = list(reports)
+        self.widget_script = widget_script
+        self.rows_served = 0
+        self._view_states = set()
+        self._lock = threading.Lock()
+
+    def add(self, reports):
+        """Publish new reports at the top of the list"""
+        with self._lock:
+            self.reports[:0] = reports
+
+    def _rows(self, first, count):
+        rows = self.reports[first:first + count]
+        self.rows_served += len(rows)
+        if not self.reports:
+            return ('<tr class="ui-widget-content ui-datatable-empty-message">'
+                    f'<td colspan="{len(HHS_COLUMNS) + 1}">No records found.</td></tr>')
+        return ''.join(
+            f'<tr data-ri="{first + i}" class="ui-widget-content" role="row">'
+            '<td role="gridcell"><div class="ui-row-toggler ui-icon ui-icon-circle-triangle-e"></div></td>'
+            + ''.join(f'<td role="gridcell">{html.escape(str(value))}</td>' for value in row) + '</tr>'
+            for i, row in enumerate(rows)
+        )
+
+    def get(self):
+        with self._lock:
+            view_state = uuid.uuid4().hex
+            self._view_states.add(view_state)
+            head = '<th role="columnheader"><span class="ui-column-title">Expand All</span></th>' + ''.join(
+                f'<th role="columnheader"><span class="ui-column-title">{html.escape(h)}</span>'
+                '<span class="ui-sortable-column-icon"></span></th>' for h in HHS_COLUMNS)
+            table = (
+                f'<div id="{self.TABLE_ID}" class="ui-datatable ui-widget">'
+                f'<div class="ui-datatable-tablewrapper"><table role="grid"><thead><tr>{head}</tr></thead>'
+                f'<tbody id="{self.TABLE_ID}_data" class="ui-datatable-data">{self._rows(0, self.PAGE_ROWS)}</tbody>'
+                '</table></div></div>'
+            )
+            if self.widget_script:
+                table += (
+                    f'<script id="{self.TABLE_ID}_s" type="text/javascript">$(function(){{PrimeFaces.cw('
+                    f'"DataTable","widget_reportResultTable",{{id:"{self.TABLE_ID}",paginator:{{'
+                    f'rows:{self.PAGE_ROWS},rowCount:{len(self.reports)},page:0}}}});}});</script>'
+                )
+        search = _table(['Search'], [['Filter results']])
+        return _page('Breach Portal', (
+            f'<form id="ocrForm" name="ocrForm" method="post" action="{PAGE_PATHS["HHS"]}">'
+            '<input type="hidden" name="ocrForm" value="ocrForm" />'
+            f'{search}{table}'
+            '<input type="hidden" name="javax.faces.ViewState" id="j_id1:javax.faces.ViewState:0" '
+            f'value="{view_state}" autocomplete="off" /></form>'
+        ))
+
+    def post(self, form):
+        """Answer a partial request from the table's pager; form maps each field to its value"""
+        with self._lock:
+            if form.get('javax.faces.ViewState') not in self._view_states:
+                changes = ('<error><error-name>javax.faces.application.ViewExpiredException</error-name>'
+                           '<error-message><![CDATA[View could not be restored.]]></error-message></error>')
+            else:
+                first = int(form.get(f'{self.TABLE_ID}_first', 0))
+                count = int(form.get(f'{self.TABLE_ID}_rows', self.PAGE_ROWS))
+                if self.reports and first >= len(self.reports):
+                    first = (len(self.reports) - 1) // count * count
+                changes = (f'<changes><update id="{self.TABLE_ID}"><![CDATA[{self._rows(first, count)}]]></update>'
+                           '<update id="j_id1:javax.faces.ViewState:0"><![CDATA['
+                           f'{form["javax.faces.ViewState"]}]]></update></changes>')
+        return 'text/xml; charset=utf-8', (
+            f'<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1">{changes}</partial-response>')
+
+def texas_page(rows, rng):
+    return _page('Data Security Breach Reports', _table(
+        ['Entity or Individual Name', 'Entity or Individual Address', 'Entity or Individual City',
+         'Entity or Individual State', 'Entity or Individual Postal Code', 'Type(s) of Information Affected',
+         'Number of Texans Affected', 'Notice Provided to Consumers (Y/N)', 'Method(s) of Notice to Consumers',
+         'Date Published at OAG Website'],
+        zip(_entity_names(rows, rng), np.full(rows, '1 Congress Ave'), np.full(rows, 'Austin'),
+            np.full(rows, 'TX'), np.full(rows, '78701'), np.full(rows, 'Name; SSN'),
+            rng.integers(250, 100_000, rows), np.full(rows, 'Y'), np.full(rows, 'U.S. Mail'),
+            _dates(rows, rng, '%m/%d/%Y')),
+        attrs='id="mycdrs"',
+    ))
+
+def washington_page(rows, rng):
+    # The WA table repeats each column label inside its cells for small screens
+    return _page('Data Breach Notifications', _table(
+        ['Date Reported', 'Organization Name', 'Date of Breach', 'Number of Washingtonians Affected',
+         'Information Compromised'],
+        zip(['Date Reported ' + d for d in _dates(rows, rng, '%m/%d/%Y')],
+            ['Organization Name ' + n for n in _entity_names(rows, rng)],
+            _dates(rows, rng, '%m/%d/%Y'),
+            [f'Number of Washingtonians Affected {n}' for n in rng.integers(500, 100_000, rows)],
+            np.full(rows, 'Name; Social Security Number')),
+    ))
+
+def hawaii_page(rows, rng):
+    return _page('Security Breach Notices', _table(
+        ['Date Notified', 'Case Number', 'Breached Entity Name', 'Breach Type', 'Hawaii Residents Impacted',
+         'Link to Letter'],
+        zip(_dates(rows, rng, '%Y.%m.%d'), [f'2024-{i:05d}' for i in range(rows)], _entity_names(rows, rng),
+            np.full(rows, 'Hacking'), rng.integers(1, 10_000, rows),
+            [f'https://cca.hawaii.gov/ocp/files/letter-{i}.pdf' for i in range(rows)]),
+    ))
+
+def california_page(rows, rng):
+    return _page('Search Data Security Breaches', _table(
+        ['Organization Name', 'Date(s) of Breach', 'Reported Date'],
+        zip(_entity_names(rows, rng), _dates(rows, rng, '%m/%d/%Y'), _dates(rows, rng, '%m/%d/%Y')),
+    ))
+
+TABLE_PAGES = {
+    'HHS': hhs_page,
+    'TX': texas_page,
+    'WA': washington_page,
+    'HI': hawaii_page,
+    'CA': california_page,
+}
+
+def build_site(rows, maine_reports, rng, recorded_dir=None):
+    """Return {path: html, or a page object such as HHSPortal} for every source page.
+
+    Tables get `rows` rows and Maine gets `maine_reports` detail pages. A
+    recorded page saved as <recorded_dir>/<SOURCE>.html replaces the synthetic
+    one, except for HHS: a recorded portal page cannot answer its pager.
+    """
+    site = maine_pages(maine_reports, rng)
+    for name, build in TABLE_PAGES.items():
+        if name != 'HHS':
+            site[PAGE_PATHS[name]] = build(rows, rng)
+    site[PAGE_PATHS['HHS']] = HHSPortal(hhs_reports(rows, rng))
+
+    if recorded_dir:
+        for name, path in PAGE_PATHS.items():
+            if name == 'HHS':
+                continue
+            recorded = os.path.join(recorded_dir, f'{name}.html')
+            if os.path.exists(recorded):
+                with open(recorded, encoding='utf-8') as f:
+                    site[path] = f.read()
+    return site
@@ -0,0 +1,74 @@
+"""Local HTTP server that stands in for the breach sites during benchmarks"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+class StandInServer:
+    """Serve {path: page} from memory on 127.0.0.1 in a background thread.
+
+    A page is either fixed HTML or an object whose get() returns the HTML
+    and whose post(form) answers a form POST with (content type, body).
+    """
+
+    def __init__(self, pages, port=0):
+        self.pages = {path: body.encode('utf-8') if isinstance(body, str) else body for path, body in pages.items()}
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _page(self):
+                server.requests += 1
+                return server.pages.get(self.path.split('?', 1)[0].split('#', 1)[0])
+
+            def _send(self, content_type, body):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                page = self._page()
+                if page is None:
+                    self.send_error(404)
+                elif isinstance(page, bytes):
+                    self._send('text/html; charset=utf-8', page)
+                else:
+                    self._send('text/html; charset=utf-8', page.get().encode('utf-8'))
+
+            def do_POST(self):
+                page = self._page()
+                length = int(self.headers.get('Content-Length') or 0)
+                form = dict(parse_qsl(self.rfile.read(length).decode('utf-8'), keep_blank_values=True))
+                if page is None:
+                    self.send_error(404)
+                elif isinstance(page, bytes):
+                    self.send_error(405)
+                else:
+                    content_type, body = page.post(form)
+                    self._send(content_type, body.encode('utf-8'))
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path):
+        return self.base_url + path
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
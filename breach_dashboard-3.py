@@ -1,39 +1,23 @@
-def get_chrome_driver():
-    """Configure Chrome driver for cloud deployment"""
-    chrome_options = Options()
-    
-    # Essential options for cloud deployment
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--remote-debugging-port=9222")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-plugins")
-    chrome_options.add_argument("--disable-images")
-    chrome_options.add_argument("--disable-javascript")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36")
-    
-    # Try to use system chromium first, then fall back to webdriver-manager
-    try:
-        # For Streamlit Cloud and similar platforms
-        chrome_options.binary_location = "/usr/bin/chromium"
-        driver = webdriver.Chrome(options=chrome_options)
-        return driver
-    except:
-        try:
-            # Fallback using webdriver-manager
-            from webdriver_manager.chrome import ChromeDriverManager
-            from selenium.webdriver.chrome.service import Service
-            
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            return driver
-        except:
-            # Last resort - try default
-            driver = webdriver.Chrome(options=chrome_options)
-            return driver
+import streamlit as st
+import pandas as pd
+import atexit
+import datetime
+import logging
+import math
+import os
+import time
+
+from breach_dashboard.cleaning import compact_breach_frame, format_counts
+from breach_dashboard.incidents import merge_incidents
+from breach_dashboard.metrics import MetricsServer
+from breach_dashboard.pipeline import (
+    BREACH_SOURCES, SNAPSHOT_PATH, SnapshotRefresher, combine_frames, due_sources, load_metrics, snapshot_time,
+)
+from breach_dashboard.query import BreachIndex
+from breach_dashboard.storage import SOURCE_CACHE
+
+log = logging.getLogger(__name__)
+
 # Configure the page
 st.set_page_config(
     page_title="Recent Data Breaches",
@@ -44,518 +28,266 @@ st.set_page_config(
 # Title
 st.title("Recently Reported Data Breaches")
 
-# Maine breach function
-def maine_breach_table():
-    driver = get_chrome_driver()
-    driver.get('https://www.maine.gov/agviewer/content/ag/985235c7-cb95-4be2-8792-a1252b4f8318/list.html')
-    urls = []
-    df_list = []
-    
-    # Gather URLs of individual breach report pages
-    for i in driver.find_elements(By.TAG_NAME, 'a'): 
-        if len(str(i.get_attribute("href"))) > 100:
-            urls.append(i.get_attribute("href"))
-    
-    # Visit each URL and gather breach report data
-    for x in urls:
-        driver.get(x)
-        q = [i for i in driver.find_element(By.XPATH, '//*[@id="content"]').text.split("\n") if ": " in i]
-        data_dict = {'URL': x}  # Initialize dictionary with URL
-        for item in q:
-            key, value = item.split(': ', 1)  # Split on first occurrence of ': '
-            data_dict[key] = value
-        df_list.append(data_dict)  # Append dictionary to list
-    
-    # Convert list of dictionaries to DataFrame
-    df = pd.DataFrame(df_list)
-    
-    # Ensure specific columns are present and add missing ones if necessary
-    columns = [
-        'Entity Name', 'Total number of persons affected (including residents)', 'Street Address', 'City',
-        'State, or Country if outside the US', 'Zip Code', 'Name', 'Date(s) Breach Occured',
-        'Date Breach Discovered', 'Type of Notification', 'Date(s) of consumer notification',
-        'Copy of notice to affected Maine residents', 'URL'
-    ]
-    for col in columns:
-        if col not in df.columns:
-            df[col] = None  # Fill missing columns with None values
+# Dataset snapshot
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _read_snapshot(path, written_at):
+    # written_at is part of the cache key, so a new snapshot is read and indexed exactly once.
+    # Held as a resource so reruns share one read-only frame instead of unpickling a copy each time.
+    return BreachIndex(compact_breach_frame(pd.read_parquet(path)))
 
-    # Convert specific columns to numeric and datetime formats
-    df['Total number of persons affected (including residents)'] = pd.to_numeric(
-        df['Total number of persons affected (including residents)'], errors="coerce")
-    df['Date(s) of consumer notification'] = pd.to_datetime(df['Date(s) of consumer notification'], errors='coerce')
-    
-    # Sort by notification date and remove duplicates
-    df = df.sort_values(by="Date(s) of consumer notification", ascending=False).drop_duplicates()
-    
-    driver.quit()
-    return df
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Return (indexed dataset, written_at) for the last good snapshot, or (None, None)"""
+    written_at = snapshot_time(path)
+    if written_at is None:
+        return None, None
+    return _read_snapshot(path, written_at), written_at
 
-# Texas breach function
-def breach_report_tx():
-    driver = get_chrome_driver()
-    driver.get('https://oag.my.site.com/datasecuritybreachreport/apex/DataSecurityReportsPage')
-    
-    try:
-        # Wait up to 10 seconds for the element to be present and clickable
-        element = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="mycdrs_last"]'))
-        )
-        element.click()
-        
-        # Extract the main breach table
-        df_tx = pd.read_html(driver.page_source)[0]
-        
-        # Rename columns to match Maine's column names
-        df_tx.columns = [
-            'Entity Name', 'Entity or Individual Address', 'City', 'State',
-            'Zip Code', 'Type of Notification', 'Total number of persons affected (including residents)',
-            'Notice Provided to Consumers (Y/N)', 'Method(s) of Notice to Consumers', 'Date Published at OAG Website'
-        ]
-        
-        # Add URL column with the Texas main URL
-        df_tx['URL'] = 'https://oag.my.site.com/datasecuritybreachreport/apex/DataSecurityReportsPage'
-    except TimeoutException:
-        print("Timed out waiting for element to be clickable")
-        driver.quit()
-        return None
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
-        driver.quit()
-        return None
-    finally:
-        driver.quit()
-        
-    return df_tx
-
-# Hawaii Table
-def hawaii_db():
-    driver = get_chrome_driver()
-    driver.get(
-    "https://cca.hawaii.gov/ocp/notices/security-breach/#:~:text=Any%20business%20or%20government%20agency,2%28f%29%2C%20Hawaii%20Revised%20Statutes")
-    df = pd.read_html(driver.page_source)[0]
-    driver.quit()
-    return df
+# Background refresh
+@st.cache_resource(show_spinner=False)
+def get_snapshot_refresher():
+    """Shared refresher so reruns and sessions never start overlapping scrapes"""
+    return SnapshotRefresher()
 
-def washington_db():
-    driver = get_chrome_driver()
-    driver.get("https://www.atg.wa.gov/data-breach-notifications")
-    df = pd.read_html(driver.page_source)[0]
-    driver.quit()
-    return df
-
-# Cleaning functions
-def clean_maine_data(df):
-    """Clean and standardize Maine data"""
-    if df is None or df.empty:
-        return None
+def load_breach_data():
+    """Serve the last good snapshot at once, refreshing stale sources in the background"""
+    refresher = get_snapshot_refresher()
+    index, written_at = load_snapshot()
     
-    df_clean = df.copy()
+    if index is not None and not refresher.is_running():
+        stale = due_sources()
+        if stale:
+            refresher.start(stale)
     
-    # Extract the needed columns
-    columns_to_extract = []
-    if 'Entity Name' in df.columns:
-        columns_to_extract.append('Entity Name')
-    if 'Total number of persons affected (including residents)' in df.columns:
-        columns_to_extract.append('Total number of persons affected (including residents)')
-    if 'Total number of Maine residents affected' in df.columns:
-        columns_to_extract.append('Total number of Maine residents affected')
-    if 'Date(s) of consumer notification' in df.columns:
-        columns_to_extract.append('Date(s) of consumer notification')
-    if 'URL' in df.columns:
-        columns_to_extract.append('URL')
-    
-    df_clean = df_clean[columns_to_extract]
-    
-    # Rename columns
-    df_clean = df_clean.rename(columns={
-        'Entity Name': 'entity_name',
-        'Total number of persons affected (including residents)': 'total_affected',
-        'Total number of Maine residents affected': 'state_residents_affected',
-        'Date(s) of consumer notification': 'date_reported',
-        "URL": 'source_link'
-    })
-    
-    df_clean['reporting_state_agency'] = 'ME'
-    
-    # Convert dates
-    if 'date_reported' in df_clean.columns:
-        df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
-    
-    # Convert numeric
-    for num_col in ['total_affected', 'state_residents_affected']:
-        if num_col in df_clean.columns:
-            df_clean[num_col] = pd.to_numeric(df_clean[num_col], errors='coerce')
-    
-    return df_clean
+    return index, written_at
 
-def clean_hhs_data(df):
-    """Clean and standardize HHS data"""
-    if df is None or df.empty:
-        return None
-    
-    df_clean = df.copy()
-    
-    # Extract needed columns
-    columns_to_extract = []
-    if 'Name of Covered Entity' in df.columns:
-        columns_to_extract.append('Name of Covered Entity')
-    if 'Individuals Affected' in df.columns:
-        columns_to_extract.append('Individuals Affected')
-    if 'Breach Submission Date' in df.columns:
-        columns_to_extract.append('Breach Submission Date')
-    
-    df_clean = df_clean[columns_to_extract]
-    
-    # Rename columns
-    df_clean = df_clean.rename(columns={
-        'Name of Covered Entity': 'entity_name',
-        'Individuals Affected': 'total_affected',
-        'Breach Submission Date': 'date_reported'
-    })
-    
-    df_clean['source_link'] = 'https://ocrportal.hhs.gov/ocr/breach/breach_report.jsf'
-    df_clean['reporting_state_agency'] = 'HHS'
-    
-    # For HHS, we don't have state-specific data
-    df_clean['state_residents_affected'] = np.nan
-    
-    # Convert dates
-    df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
-    
-    # Convert numeric
-    df_clean['total_affected'] = pd.to_numeric(df_clean['total_affected'], errors='coerce')
-    
-    return df_clean
+# Metrics endpoint and admin panel
+METRICS_PORT = os.environ.get('BREACH_METRICS_PORT')
+# Metrics stay on the loopback interface unless, say, BREACH_METRICS_HOST=0.0.0.0 opens them up
+METRICS_HOST = os.environ.get('BREACH_METRICS_HOST', '127.0.0.1')
+ADMIN_PANEL = os.environ.get('BREACH_ADMIN_PANEL', '').lower() in ('1', 'true', 'yes')
 
-def clean_texas_data(df):
-    """Clean and standardize Texas data"""
-    if df is None or df.empty:
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port, host=METRICS_HOST):
+    """Serve /metrics once per process, on the port given by BREACH_METRICS_PORT, or return None if it is taken"""
+    try:
+        server = MetricsServer(int(port), host)
+    except OSError as e:
+        # Another replica on this host already serves the port; the dashboard works without it
+        log.warning("Not serving metrics on port %s: %s", port, e)
         return None
-    
-    df_clean = df.copy()
-    
-    # Extract needed columns
-    columns_to_extract = []
-    if 'Entity Name' in df.columns:
-        columns_to_extract.append('Entity Name')
-    if 'Total number of persons affected (including residents)' in df.columns:
-        columns_to_extract.append('Total number of persons affected (including residents)')
-    if 'Date Published at OAG Website' in df.columns:
-        columns_to_extract.append('Date Published at OAG Website')
-    if 'URL' in df.columns:
-        columns_to_extract.append('URL')
-    
-    df_clean = df_clean[columns_to_extract]
-    
-    # Rename columns
-    df_clean = df_clean.rename(columns={
-        'Entity Name': 'entity_name',
-        'Total number of persons affected (including residents)': 'state_residents_affected',  # TX reports state numbers
-        'Date Published at OAG Website': 'date_reported',
-        'URL': 'source_link'
-    })
-    
-    df_clean['reporting_state_agency'] = 'TX'
-    
-    # For Texas, we don't have national total
-    df_clean['total_affected'] = np.nan
-    
-    # Convert dates
-    df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
-    
-    # Convert numeric
-    df_clean['state_residents_affected'] = pd.to_numeric(df_clean['state_residents_affected'], errors='coerce')
-    
-    return df_clean
+    atexit.register(server.close)
+    return server
 
-def clean_washington_data(df):
-    """Clean and standardize Washington data"""
-    if df is None or df.empty:
-        return None
-    
-    df_clean = df.copy()
-    
-    # Create new dataframe with extracted data
-    data = []
-    for _, row in df_clean.iterrows():
-        entry = {}
-        
-        # Extract entity name
-        if 'Organization Name' in row:
-            org_name = str(row['Organization Name'])
-            entity_name = org_name.replace('Organization Name ', '')
-            entry['entity_name'] = entity_name
-        
-        # Extract date reported
-        if 'Date Reported' in row:
-            date_reported = str(row['Date Reported'])
-            date_reported = date_reported.replace('Date Reported ', '')
-            entry['date_reported'] = pd.to_datetime(date_reported, errors='coerce')
-        
-        # Extract number of WA residents affected
-        if 'Number of Washingtonians Affected' in row:
-            wa_affected = str(row['Number of Washingtonians Affected'])
-            wa_affected = wa_affected.replace('Number of Washingtonians Affected ', '')
-            entry['state_residents_affected'] = pd.to_numeric(wa_affected, errors='coerce')
-        
-        entry['source_link'] = 'https://www.atg.wa.gov/data-breach-notifications'
-        entry['reporting_state_agency'] = 'WA'
-        
-        # We don't have total affected for WA
-        entry['total_affected'] = np.nan
-        
-        data.append(entry)
-    
-    df_clean = pd.DataFrame(data)
-    
-    return df_clean
+# Display
+# Days shown before the date range is changed
+DEFAULT_WINDOW_DAYS = 14
+PAGE_SIZES = [25, 50, 100, 250]
 
-def clean_hawaii_data(df):
-    """Clean and standardize Hawaii data"""
-    if df is None or df.empty:
-        return None
-    
-    df_clean = df.copy()
-    
-    # Extract needed columns
-    columns_to_extract = []
-    if 'Breached Entity Name' in df.columns:
-        columns_to_extract.append('Breached Entity Name')
-    if 'Date Notified' in df.columns:
-        columns_to_extract.append('Date Notified')
-    if 'Hawaii Residents Impacted' in df.columns:
-        columns_to_extract.append('Hawaii Residents Impacted')
-    if 'Link to Letter' in df.columns:
-        columns_to_extract.append('Link to Letter')
-    
-    df_clean = df_clean[columns_to_extract]
-    
-    # Rename columns
-    df_clean = df_clean.rename(columns={
-        'Breached Entity Name': 'entity_name',
-        'Date Notified': 'date_reported',
-        'Hawaii Residents Impacted': 'state_residents_affected',
-        'Link to Letter': 'source_link'
-    })
-    
-    if 'source_link' in df_clean.columns:
-        df_clean['source_link'] = df_clean['source_link'].fillna('https://cca.hawaii.gov/ocp/notices/security-breach/')
-    
-    df_clean['reporting_state_agency'] = 'HI'
-    
-    # We don't have total affected for HI
-    df_clean['total_affected'] = np.nan
-    
-    # Convert dates
-    if 'date_reported' in df_clean.columns:
-        df_clean['date_reported'] = df_clean['date_reported'].apply(
-            lambda x: pd.to_datetime(str(x).replace('.', '/'), errors='coerce', format='%Y/%m/%d')
-            if isinstance(x, str) else pd.NaT
-        )
-    
-    # Convert numeric
-    df_clean['state_residents_affected'] = pd.to_numeric(df_clean['state_residents_affected'], errors='coerce')
-    
-    return df_clean
+SOURCE_STATUS_LABELS = {
+    'pending': '⏳ loading',
+    'changed': '✅ updated',
+    'unchanged': '✅ unchanged',
+    'partial': '⏳ partly fetched',
+    'failed': '❌ failed',
+    'skipped': '⏸️ paused',
+    'shared': '✅ refreshed elsewhere',
+}
 
-def clean_california_data(df):
-    """Clean and standardize California data"""
-    if df is None or df.empty:
-        return None
-    
-    df_clean = df.copy()
-    
-    # Rename columns
-    df_clean = df_clean.rename(columns={
-        'Organization Name': 'entity_name',
-        'Reported Date': 'date_reported'
+def render_source_status(progress):
+    """One status cell per source: pending, done or failed, with the time it took"""
+    if not progress:
+        return
+    columns = st.columns(len(progress))
+    for column, (name, entry) in zip(columns, progress.items()):
+        label = SOURCE_STATUS_LABELS.get(entry['status'], entry['status'])
+        if entry['seconds'] is not None:
+            label += f" · {entry['seconds']:.1f}s"
+        column.markdown(f"**{name}**  \n{label}")
+
+def render_filters():
+    """Date-range, agency, entity-name and page controls; returns the chosen filters"""
+    today = datetime.date.today()
+    date_col, agency_col, search_col, size_col, page_col = st.columns([2, 2, 2, 1, 1])
+    dates = date_col.date_input(
+        "Reported between", value=(today - datetime.timedelta(days=DEFAULT_WINDOW_DAYS), today))
+    agencies = agency_col.multiselect("Agencies", list(BREACH_SOURCES), placeholder="All agencies")
+    text = search_col.text_input("Entity name contains")
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1)
+    page = page_col.number_input("Page", min_value=1, value=1, step=1)
+    
+    # The date picker returns a single date while the second end of the range is being chosen
+    start = dates[0] if dates else None
+    end = dates[1] if len(dates) > 1 else start
+    return {'start': start, 'end': end, 'agencies': agencies, 'text': text,
+            'page_size': page_size, 'page': int(page)}
+
+def render_breach_table(index, merge_reports, filters):
+    """Show one page of the breaches matching the filters"""
+    # The date range includes the whole end day
+    end = filters['end'] + datetime.timedelta(days=1) if filters['end'] else None
+    rows = index.query(filters['start'], end, filters['agencies'], filters['text'])
+    
+    # Optionally show each breach once, listing every agency that reported it
+    page_size = filters['page_size']
+    total = len(index.incidents(rows)) if merge_reports else len(rows)
+    pages = max(1, math.ceil(total / page_size))
+    page = min(filters['page'], pages)
+    if merge_reports:
+        filtered_df = merge_incidents(index.incident_page(rows, page, page_size))
+        filtered_df['reporting_state_agency'] = filtered_df['reporting_agencies'].str.join(', ')
+        filtered_df = filtered_df.drop(columns='reporting_agencies')
+    else:
+        filtered_df = index.page(rows, page, page_size)
+    
+    # Display the filtered table
+    first = (page - 1) * page_size + 1 if total else 0
+    last = min(page * page_size, total)
+    since = filters['start'].strftime('%Y-%m-%d') if filters['start'] else 'the start'
+    until = filters['end'].strftime('%Y-%m-%d') if filters['end'] else 'today'
+    st.markdown(f"**Showing {first}–{last} of {total} breaches reported {since} to {until}** · page {page} of {pages}")
+    
+    # Format the display; incident ids are only for grouping
+    display_df = filtered_df.drop(columns='incident_id', errors='ignore')
+    
+    # Rename columns for better display
+    display_df = display_df.rename(columns={
+        'entity_name': 'Entity Name',
+        'date_reported': 'Date Reported',
+        'total_affected': 'Total Affected',
+        'state_residents_affected': 'State Residents Affected',
+        'reporting_state_agency': 'Reporting State/Agency',
+        'source_link': 'Source Link'
     })
     
-    df_clean['reporting_state_agency'] = 'CA'
-    df_clean['source_link'] = 'https://oag.ca.gov/privacy/databreach/list'
+    # Format numbers with commas
+    if 'Total Affected' in display_df.columns:
+        display_df['Total Affected'] = format_counts(display_df['Total Affected'])
     
-    # California doesn't provide affected numbers
-    df_clean['total_affected'] = np.nan
-    df_clean['state_residents_affected'] = np.nan
+    if 'State Residents Affected' in display_df.columns:
+        display_df['State Residents Affected'] = format_counts(display_df['State Residents Affected'])
     
-    # Convert dates
-    if 'date_reported' in df_clean.columns:
-        df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
+    # Format date
+    if 'Date Reported' in display_df.columns:
+        display_df['Date Reported'] = display_df['Date Reported'].dt.strftime('%Y-%m-%d')
     
-    return df_clean
+    # Display the table
+    st.dataframe(
+        display_df,
+        use_container_width=True,
+        hide_index=True
+    )
 
-def final_cleaning(df):
-    """Perform final cleaning and standardization"""
-    if df is None or df.empty:
-        return pd.DataFrame()
-    
-    df_clean = df.copy()
-    
-    # Ensure all required columns exist
-    required_columns = [
-        'entity_name', 
-        'total_affected', 
-        'state_residents_affected',
-        'date_reported', 
-        'reporting_state', 
-        'source_link'
-    ]
-    
-    for col in required_columns:
-        if col not in df_clean.columns:
-            df_clean[col] = np.nan
-    
-    # Handle duplicates
-    if not df_clean.empty:
-        df_clean['nan_count'] = df_clean.isna().sum(axis=1)
-        df_clean = df_clean.sort_values(['entity_name', 'date_reported', 'nan_count'])
-        df_clean = df_clean.drop_duplicates(subset=['entity_name', 'date_reported'], keep='first')
-        df_clean = df_clean.drop('nan_count', axis=1)
-    
-    # Standardize dates
-    for date_col in ['date_reported', 'date_breach_occurred', 'date_breach_discovered']:
-        if date_col in df_clean.columns:
-            df_clean[date_col] = pd.to_datetime(df_clean[date_col], errors='coerce')
-    
-    # Standardize numeric columns
-    for num_col in ['total_affected', 'state_residents_affected']:
-        if num_col in df_clean.columns:
-            if df_clean[num_col].dtype == 'object':
-                df_clean[num_col] = df_clean[num_col].apply(
-                    lambda x: pd.to_numeric(re.sub(r'[^\d.]', '', str(x)) if str(x).strip() else np.nan, 
-                                           errors='coerce')
-                )
-    
-    # Fill missing date_breach_occurred
-    if 'date_breach_occurred' in df_clean.columns and 'date_breach_discovered' in df_clean.columns:
-        mask = df_clean['date_breach_occurred'].isna() & df_clean['date_breach_discovered'].notna()
-        df_clean.loc[mask, 'date_breach_occurred'] = df_clean.loc[mask, 'date_breach_discovered']
-    
-    # Sort by date reported
-    df_clean = df_clean.sort_values('date_reported', ascending=False)
-    df_clean = df_clean.reset_index(drop=True)
-    
-    return df_clean
+def stream_refresh(refresher, merge_reports, filters, poll_seconds=0.5):
+    """Re-render the status strip and table as each source of a running refresh arrives"""
+    status_slot = st.empty()
+    table_slot = st.empty()
+    shown = None
+    
+    while refresher.is_running():
+        progress, frames = refresher.progress()
+        if progress != shown:
+            with status_slot.container():
+                render_source_status(progress)
+            
+            # Merge whatever has arrived so far, in the usual source order
+            partial_df = combine_frames([frames.get(name) for name in BREACH_SOURCES])
+            with table_slot.container():
+                if partial_df.empty:
+                    st.info("Collecting and processing breach data...")
+                else:
+                    render_breach_table(BreachIndex(partial_df), merge_reports, filters)
+            shown = progress
+        time.sleep(poll_seconds)
+    
+    status_slot.empty()
+    table_slot.empty()
 
-@st.cache_data(ttl=3600)
-def clean_and_combine_breach_tables():
-    """Function to clean and combine data breach tables from multiple sources"""
-    
-    with st.spinner("Collecting and processing breach data..."):
-        # Load Maine data
-        df_maine = maine_breach_table()
-        
-        # Load HHS data
-        try:
-            df_hhs = pd.read_html(requests.get("https://ocrportal.hhs.gov/ocr/breach/breach_report.jsf").text)[1]
-        except:
-            df_hhs = pd.DataFrame()
-        
-        # Load Texas data
-        df_tx = breach_report_tx()
-        
-        # Load Washington data
-        df_wa = washington_db()
+def render_metrics_panel():
+    """Sidebar admin panel with the stage timings and counters of the last saved metrics"""
+    snapshot = load_metrics()
+    with st.expander("Pipeline metrics"):
+        if not snapshot:
+            st.caption("No metrics recorded yet")
+            return
+        written_at = datetime.datetime.fromtimestamp(snapshot['written_at']).strftime('%Y-%m-%d %H:%M:%S')
+        st.caption(f"Saved {written_at}")
         
-        # Load Hawaii data
-        df_hi = hawaii_db()
+        spans = pd.DataFrame(snapshot['spans'])
+        if not spans.empty:
+            spans['source'] = spans['source'].fillna('all')
+            st.dataframe(spans.sort_values('seconds_total', ascending=False).round(3), hide_index=True)
         
-        # Load California data
-        try:
-            df_ca = pd.read_html(requests.get("https://oag.ca.gov/privacy/databreach/list").text)[0]
-        except:
-            df_ca = pd.DataFrame()
-    
-    # Clean each table
-    df_maine_clean = clean_maine_data(df_maine)
-    df_hhs_clean = clean_hhs_data(df_hhs)
-    df_tx_clean = clean_texas_data(df_tx)
-    df_wa_clean = clean_washington_data(df_wa)
-    df_hi_clean = clean_hawaii_data(df_hi)
-    df_ca_clean = clean_california_data(df_ca)
-    
-    # Combine all cleaned dataframes
-    dfs_to_combine = [
-        df_maine_clean, 
-        df_hhs_clean, 
-        df_tx_clean, 
-        df_wa_clean, 
-        df_hi_clean, 
-        df_ca_clean
-    ]
-    
-    # Filter out any None values
-    dfs_to_combine = [df for df in dfs_to_combine if df is not None]
-    
-    # Combine all dataframes
-    combined_df = pd.concat(dfs_to_combine, ignore_index=True)
-    
-    # Final cleaning
-    final_df = final_cleaning(combined_df)
-    
-    return final_df
+        counters = pd.DataFrame(snapshot['counters'])
+        if not counters.empty:
+            counters['source'] = counters['source'].fillna('all')
+            st.dataframe(counters.pivot_table(index='name', columns='source', values='value', aggfunc='sum'))
 
 # Main app
 def main():
     # Load data
     try:
-        df = clean_and_combine_breach_tables()
+        if METRICS_PORT:
+            start_metrics_server(METRICS_PORT)
+        refresher = get_snapshot_refresher()
+        merge_reports = st.toggle("Merge reports of the same breach", value=True)
+        filters = render_filters()
+        index, written_at = load_breach_data()
         
-        if df.empty:
+        if index is None:
+            # Nothing on disk yet: show each source as soon as it arrives instead of a spinner
+            refresher.start()
+            stream_refresh(refresher, merge_reports, filters)
+            index, written_at = load_snapshot()
+        
+        if index is None or len(index) == 0:
             st.warning("No data was collected. Please check your internet connection and try again.")
             return
         
-        # Filter for past 2 weeks
-        two_weeks_ago = pd.Timestamp.now() - pd.Timedelta(days=14)
-        
-        # Filter the dataframe
-        filtered_df = df[df['date_reported'] >= two_weeks_ago].copy()
-        
-        # Display the filtered table
-        st.markdown(f"**Showing {len(filtered_df)} breaches reported since {two_weeks_ago.strftime('%Y-%m-%d')}**")
-        
-        # Format the display
-        display_df = filtered_df.copy()
-        
-        # Rename columns for better display
-        display_df = display_df.rename(columns={
-            'entity_name': 'Entity Name',
-            'date_reported': 'Date Reported',
-            'total_affected': 'Total Affected',
-            'state_residents_affected': 'State Residents Affected',
-            'reporting_state_agency': 'Reporting State/Agency',
-            'source_link': 'Source Link'
-        })
-        
-        # Format numbers with commas
-        if 'Total Affected' in display_df.columns:
-            display_df['Total Affected'] = display_df['Total Affected'].apply(
-                lambda x: f"{int(x):,}" if pd.notna(x) else "N/A"
-            )
-        
-        if 'State Residents Affected' in display_df.columns:
-            display_df['State Residents Affected'] = display_df['State Residents Affected'].apply(
-                lambda x: f"{int(x):,}" if pd.notna(x) else "N/A"
-            )
-        
-        # Format date
-        if 'Date Reported' in display_df.columns:
-            display_df['Date Reported'] = display_df['Date Reported'].dt.strftime('%Y-%m-%d')
-        
-        # Display the table
-        st.dataframe(
-            display_df,
-            use_container_width=True,
-            hide_index=True
-        )
+        render_breach_table(index, merge_reports, filters)
+        status = f"Data collected {written_at.strftime('%Y-%m-%d %H:%M')}"
+        if refresher.is_running():
+            status += " · refreshing in the background"
+        st.caption(status)
+        failing = [name for name in BREACH_SOURCES if SOURCE_CACHE.failures(name)[0]]
+        if failing:
+            st.caption(f"⚠️ {', '.join(failing)} could not be refreshed; showing their last good data")
+        if refresher.is_running():
+            render_source_status(refresher.progress()[0])
         
         # Refresh button
         if st.button("🔄 Refresh Data"):
-            st.cache_data.clear()
+            refresher.start()
             st.rerun()
         
+        # Per-source status and refresh
+        with st.sidebar:
+            st.subheader("Sources")
+            for name in BREACH_SOURCES:
+                refreshed_at = SOURCE_CACHE.refreshed_at(name)
+                when = (datetime.datetime.fromtimestamp(refreshed_at).strftime('%Y-%m-%d %H:%M')
+                        if refreshed_at else "never")
+                caption = f"**{name}** · checked {when}"
+                fetch_path = SOURCE_CACHE.fetch_path(name)
+                if fetch_path:
+                    caption += f" · via {fetch_path}"
+                
+                # A failing source is served from its last good data
+                failures, open_until = SOURCE_CACHE.failures(name)
+                if SOURCE_CACHE.circuit_open(name):
+                    resume = datetime.datetime.fromtimestamp(open_until).strftime('%H:%M')
+                    caption += f" · ⏸️ failing, paused until {resume}"
+                elif failures:
+                    caption += f" · ⚠️ last {failures} refresh{'es' if failures > 1 else ''} failed"
+                st.caption(caption)
+            source = st.selectbox("Source", list(BREACH_SOURCES))
+            if st.button("Refresh source"):
+                refresher.start([source])
+                st.rerun()
+            if ADMIN_PANEL:
+                render_metrics_panel()
+        
     except Exception as e:
+        # Source failures never get here; they fall back to each source's last good data
         st.error(f"An error occurred: {str(e)}")
         st.info("Please try refreshing the page.")
 
@@ -0,0 +1,5 @@
+"""Collect, clean and combine recently reported data breaches from state and federal sources.
+
+The Streamlit dashboard (breach_dashboard-3.py) serves the combined data;
+`python -m breach_dashboard collect` refreshes it without Streamlit.
+"""
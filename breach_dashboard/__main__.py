@@ -0,0 +1,99 @@
+"""Command line entry point for running the pipeline without the dashboard.
+
+    python -m breach_dashboard collect
+    python -m breach_dashboard collect --due --data-dir /srv/breach_data
+    python -m breach_dashboard collect --sources ME HHS --force
+    python -m breach_dashboard collect --sources ME HHS --full-recrawl
+
+Streamlit is never imported, and Selenium only when a source needs the browser.
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+
+# The same names as pipeline.BREACH_SOURCES, listed here so --help does not import the pipeline
+SOURCE_NAMES = ['ME', 'HHS', 'TX', 'WA', 'HI', 'CA']
+
+def collect_command(args):
+    # DATA_DIR is read when the pipeline is imported, so point it at the chosen directory first
+    if args.data_dir:
+        os.environ['BREACH_DATA_DIR'] = os.path.abspath(args.data_dir)
+    from .pipeline import collect, due_sources
+
+    sources = args.sources or (due_sources() if args.due else None)
+    if sources == []:
+        print("No sources are due")
+        return 0
+
+    failed = []
+
+    def report(name, status, frame, seconds):
+        rows = 0 if frame is None else len(frame)
+        print(f"{name:4} {status:9} {seconds:7.1f}s  {rows:>8,} rows")
+        if status == 'failed':
+            failed.append(name)
+
+    try:
+        path = collect(sources, force=args.force, on_source=report, output=args.output,
+                       full_recrawl=args.full_recrawl)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if path is None:
+        print("No source changed; the snapshot is unchanged")
+    else:
+        print(f"Wrote {path}")
+    if failed:
+        print(f"Failed sources: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m breach_dashboard', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log-level', default='WARNING', help='logging level, e.g. INFO or DEBUG')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect_parser = commands.add_parser('collect', help='refresh sources and write a dated snapshot')
+    collect_parser.add_argument('--sources', nargs='+', choices=SOURCE_NAMES,
+                                help='sources to refresh (default: all)')
+    collect_parser.add_argument('--due', action='store_true', help='refresh only sources past their TTL')
+    collect_parser.add_argument('--force', action='store_true',
+                                help='write a snapshot even when no source changed')
+    collect_parser.add_argument('--full-recrawl', action='store_true',
+                                help='fetch every Maine and HHS report again, not only new ones')
+    collect_parser.add_argument('--data-dir', help='data directory (default: $BREACH_DATA_DIR or .breach_data)')
+    collect_parser.add_argument('--output', help='snapshot path (default: <data dir>/snapshots/breaches-<time>.parquet)')
+    collect_parser.set_defaults(func=collect_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    code = args.func(args)
+    exit_if_stuck(code)
+    return code
+
+def exit_if_stuck(code):
+    """Exit now if worker threads of a source that overran its deadline are still running.
+
+    Python waits for non-daemon threads, such as thread pool workers, before
+    exiting, so a scheduled collect could hang for as long as a stuck page
+    load. Everything is saved by the time this runs.
+    """
+    stuck = [thread.name for thread in threading.enumerate()
+             if thread is not threading.main_thread() and not thread.daemon and thread.is_alive()]
+    if not stuck:
+        return
+    logging.getLogger(__name__).warning("Exiting with threads still running: %s", ', '.join(stuck))
+    from .browser import close_driver_pool
+    
+    close_driver_pool()
+    logging.shutdown()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+if __name__ == '__main__':
+    sys.exit(main())
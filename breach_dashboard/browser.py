@@ -0,0 +1,200 @@
+"""Headless Chrome sessions for the sources that only render in a browser.
+
+Selenium is imported when the first browser starts, so HTTP-only runs never load it.
+"""
+import atexit
+import os
+import queue
+import socket
+import threading
+from contextlib import contextmanager
+
+from .metrics import METRICS
+
+def _free_port():
+    """Ask the OS for an unused local port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def chrome_options():
+    """Configure Chrome options for cloud deployment"""
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    
+    # Essential options for cloud deployment
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    # Each driver gets its own debugging port so several Chrome instances can run side by side
+    chrome_options.add_argument(f"--remote-debugging-port={_free_port()}")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-plugins")
+    chrome_options.add_argument("--disable-images")
+    chrome_options.add_argument("--disable-javascript")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36")
+    return chrome_options
+
+def _launch_system_chromium():
+    from selenium import webdriver
+    
+    # For Streamlit Cloud and similar platforms
+    options = chrome_options()
+    options.binary_location = "/usr/bin/chromium"
+    return webdriver.Chrome(options=options)
+
+def _launch_default_chrome():
+    from selenium import webdriver
+    
+    return webdriver.Chrome(options=chrome_options())
+
+def resolve_chrome_launcher():
+    """Find a working way to start Chrome and return (driver, launcher) so later starts skip the search"""
+    # Try to use system chromium first, then fall back to webdriver-manager
+    try:
+        return _launch_system_chromium(), _launch_system_chromium
+    except Exception:
+        pass
+    
+    try:
+        # Fallback using webdriver-manager, installing the driver binary only once
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        
+        driver_path = ChromeDriverManager().install()
+        
+        def launch_managed_chromedriver():
+            return webdriver.Chrome(service=Service(driver_path), options=chrome_options())
+        
+        return launch_managed_chromedriver(), launch_managed_chromedriver
+    except Exception:
+        pass
+    
+    # Last resort - try default
+    return _launch_default_chrome(), _launch_default_chrome
+
+# Browser pool
+DRIVER_POOL_SIZE = int(os.environ.get('BREACH_DRIVER_POOL_SIZE', 2))
+DRIVER_MAX_USES = int(os.environ.get('BREACH_DRIVER_MAX_USES', 50))
+# Seconds driver.get() may wait for a page before raising, and a caller may wait for a free browser
+PAGE_LOAD_TIMEOUT = int(os.environ.get('BREACH_PAGE_LOAD_TIMEOUT', 60))
+DRIVER_WAIT_TIMEOUT = 120
+
+class DriverPool:
+    """Thread-safe pool of reusable headless Chrome sessions"""
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._launcher = None
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        # The first launch works out which binary to use; later launches reuse that answer
+        with METRICS.span('chrome_start'):
+            with self._lock:
+                if self._launcher is None:
+                    driver, self._launcher = resolve_chrome_launcher()
+                else:
+                    driver = None
+            if driver is None:
+                driver = self._launcher()
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        METRICS.incr('drivers_started')
+        with self._lock:
+            self._uses[driver] = 0
+        return driver
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        METRICS.incr('drivers_recycled')
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=DRIVER_WAIT_TIMEOUT):
+        """Check out a healthy driver, starting one if no idle session is available"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser became free within {timeout} seconds")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._launch()
+                if self._is_healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        """Return a driver to the pool, recycling it once worn out or crashed"""
+        try:
+            with self._lock:
+                uses = self._uses.get(driver, 0) + 1
+                self._uses[driver] = uses
+            if uses >= self.max_uses or not self._is_healthy(driver):
+                self._discard(driver)
+                return
+            try:
+                # Drop the previous page so idle sessions hold as little memory as possible
+                driver.delete_all_cookies()
+                driver.get('about:blank')
+            except Exception:
+                self._discard(driver)
+                return
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=DRIVER_WAIT_TIMEOUT):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle driver"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    """Shared browser pool for the whole process, created on first use"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+            atexit.register(_driver_pool.close)
+        return _driver_pool
+
+def close_driver_pool():
+    """Quit the shared pool's idle drivers, if the pool was ever created"""
+    if _driver_pool is not None:
+        _driver_pool.close()
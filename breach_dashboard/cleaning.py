@@ -0,0 +1,447 @@
+"""Turn each source's raw table into the common breach columns"""
+import numpy as np
+import pandas as pd
+
+def _strip_label(series, label):
+    """Text of each value with a repeated cell label removed"""
+    return series.map(str).str.replace(label, '', regex=False)
+
+def _text_values(series):
+    """Keep only the str values of a column, with everything else missing"""
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Series(np.nan, index=series.index, dtype=object)
+    return series.where(series.map(type, na_action='ignore').eq(str)).astype(object)
+
+def parse_dates(series):
+    """pd.to_datetime on each distinct value once, letting every value have its own format"""
+    uniques = pd.unique(series.astype(object))
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce', format='mixed')
+    return series.map(pd.Series(parsed.values, index=uniques))
+
+def parse_counts(series):
+    """Numbers from free text: keep digits and dots, blank text becomes NaN"""
+    text = series.map(str)
+    digits = text.str.replace(r'[^\d.]', '', regex=True)
+    digits = digits.where(text.str.strip() != '')
+    return pd.to_numeric(digits, errors='coerce')
+
+def format_counts(series):
+    """Format counts as whole numbers with thousands separators, 'N/A' where missing"""
+    counts = pd.to_numeric(series, errors='coerce')
+    valid = counts.notna()
+    formatted = pd.Series('N/A', index=series.index)
+    formatted[valid] = counts[valid].astype('int64').map('{:,}'.format)
+    return formatted
+
+def clean_maine_data(df):
+    """Clean and standardize Maine data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Extract the needed columns
+    columns_to_extract = []
+    if 'Entity Name' in df.columns:
+        columns_to_extract.append('Entity Name')
+    if 'Total number of persons affected (including residents)' in df.columns:
+        columns_to_extract.append('Total number of persons affected (including residents)')
+    if 'Total number of Maine residents affected' in df.columns:
+        columns_to_extract.append('Total number of Maine residents affected')
+    if 'Date(s) of consumer notification' in df.columns:
+        columns_to_extract.append('Date(s) of consumer notification')
+    if 'URL' in df.columns:
+        columns_to_extract.append('URL')
+    
+    df_clean = df_clean[columns_to_extract]
+    
+    # Rename columns
+    df_clean = df_clean.rename(columns={
+        'Entity Name': 'entity_name',
+        'Total number of persons affected (including residents)': 'total_affected',
+        'Total number of Maine residents affected': 'state_residents_affected',
+        'Date(s) of consumer notification': 'date_reported',
+        "URL": 'source_link'
+    })
+    
+    df_clean['reporting_state_agency'] = 'ME'
+    
+    # Convert dates
+    if 'date_reported' in df_clean.columns:
+        df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
+    
+    # Convert numeric
+    for num_col in ['total_affected', 'state_residents_affected']:
+        if num_col in df_clean.columns:
+            df_clean[num_col] = pd.to_numeric(df_clean[num_col], errors='coerce')
+    
+    return df_clean
+
+def clean_hhs_data(df):
+    """Clean and standardize HHS data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Extract needed columns
+    columns_to_extract = []
+    if 'Name of Covered Entity' in df.columns:
+        columns_to_extract.append('Name of Covered Entity')
+    if 'Individuals Affected' in df.columns:
+        columns_to_extract.append('Individuals Affected')
+    if 'Breach Submission Date' in df.columns:
+        columns_to_extract.append('Breach Submission Date')
+    
+    df_clean = df_clean[columns_to_extract]
+    
+    # Rename columns
+    df_clean = df_clean.rename(columns={
+        'Name of Covered Entity': 'entity_name',
+        'Individuals Affected': 'total_affected',
+        'Breach Submission Date': 'date_reported'
+    })
+    
+    df_clean['source_link'] = 'https://ocrportal.hhs.gov/ocr/breach/breach_report.jsf'
+    df_clean['reporting_state_agency'] = 'HHS'
+    
+    # For HHS, we don't have state-specific data
+    df_clean['state_residents_affected'] = np.nan
+    
+    # Convert dates
+    df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
+    
+    # Convert numeric
+    df_clean['total_affected'] = pd.to_numeric(df_clean['total_affected'], errors='coerce')
+    
+    return df_clean
+
+def clean_texas_data(df):
+    """Clean and standardize Texas data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Extract needed columns
+    columns_to_extract = []
+    if 'Entity Name' in df.columns:
+        columns_to_extract.append('Entity Name')
+    if 'Total number of persons affected (including residents)' in df.columns:
+        columns_to_extract.append('Total number of persons affected (including residents)')
+    if 'Date Published at OAG Website' in df.columns:
+        columns_to_extract.append('Date Published at OAG Website')
+    if 'URL' in df.columns:
+        columns_to_extract.append('URL')
+    
+    df_clean = df_clean[columns_to_extract]
+    
+    # Rename columns
+    df_clean = df_clean.rename(columns={
+        'Entity Name': 'entity_name',
+        'Total number of persons affected (including residents)': 'state_residents_affected',  # TX reports state numbers
+        'Date Published at OAG Website': 'date_reported',
+        'URL': 'source_link'
+    })
+    
+    df_clean['reporting_state_agency'] = 'TX'
+    
+    # For Texas, we don't have national total
+    df_clean['total_affected'] = np.nan
+    
+    # Convert dates
+    df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
+    
+    # Convert numeric
+    df_clean['state_residents_affected'] = pd.to_numeric(df_clean['state_residents_affected'], errors='coerce')
+    
+    return df_clean
+
+def clean_washington_data(df):
+    """Clean and standardize Washington data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Build the cleaned columns from whichever source columns are present
+    columns = {}
+    
+    # Extract entity name
+    if 'Organization Name' in df_clean.columns:
+        columns['entity_name'] = _strip_label(df_clean['Organization Name'], 'Organization Name ')
+    
+    # Extract date reported
+    if 'Date Reported' in df_clean.columns:
+        columns['date_reported'] = parse_dates(_strip_label(df_clean['Date Reported'], 'Date Reported '))
+    
+    # Extract number of WA residents affected
+    if 'Number of Washingtonians Affected' in df_clean.columns:
+        wa_affected = _strip_label(df_clean['Number of Washingtonians Affected'], 'Number of Washingtonians Affected ')
+        columns['state_residents_affected'] = pd.to_numeric(wa_affected, errors='coerce')
+    
+    columns['source_link'] = 'https://www.atg.wa.gov/data-breach-notifications'
+    columns['reporting_state_agency'] = 'WA'
+    
+    # We don't have total affected for WA
+    columns['total_affected'] = np.nan
+    
+    df_clean = pd.DataFrame(columns, index=df_clean.index).reset_index(drop=True)
+    
+    return df_clean
+
+def clean_hawaii_data(df):
+    """Clean and standardize Hawaii data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Extract needed columns
+    columns_to_extract = []
+    if 'Breached Entity Name' in df.columns:
+        columns_to_extract.append('Breached Entity Name')
+    if 'Date Notified' in df.columns:
+        columns_to_extract.append('Date Notified')
+    if 'Hawaii Residents Impacted' in df.columns:
+        columns_to_extract.append('Hawaii Residents Impacted')
+    if 'Link to Letter' in df.columns:
+        columns_to_extract.append('Link to Letter')
+    
+    df_clean = df_clean[columns_to_extract]
+    
+    # Rename columns
+    df_clean = df_clean.rename(columns={
+        'Breached Entity Name': 'entity_name',
+        'Date Notified': 'date_reported',
+        'Hawaii Residents Impacted': 'state_residents_affected',
+        'Link to Letter': 'source_link'
+    })
+    
+    if 'source_link' in df_clean.columns:
+        df_clean['source_link'] = df_clean['source_link'].fillna('https://cca.hawaii.gov/ocp/notices/security-breach/')
+    
+    df_clean['reporting_state_agency'] = 'HI'
+    
+    # We don't have total affected for HI
+    df_clean['total_affected'] = np.nan
+    
+    # Convert dates; only text values like 2024.01.31 can be dates
+    if 'date_reported' in df_clean.columns:
+        dates = _text_values(df_clean['date_reported']).str.replace('.', '/', regex=False)
+        df_clean['date_reported'] = pd.to_datetime(dates, errors='coerce', format='%Y/%m/%d')
+    
+    # Convert numeric
+    df_clean['state_residents_affected'] = pd.to_numeric(df_clean['state_residents_affected'], errors='coerce')
+    
+    return df_clean
+
+def clean_california_data(df):
+    """Clean and standardize California data"""
+    if df is None or df.empty:
+        return None
+    
+    df_clean = df.copy()
+    
+    # Rename columns
+    df_clean = df_clean.rename(columns={
+        'Organization Name': 'entity_name',
+        'Reported Date': 'date_reported'
+    })
+    
+    df_clean['reporting_state_agency'] = 'CA'
+    df_clean['source_link'] = 'https://oag.ca.gov/privacy/databreach/list'
+    
+    # California doesn't provide affected numbers
+    df_clean['total_affected'] = np.nan
+    df_clean['state_residents_affected'] = np.nan
+    
+    # Convert dates
+    if 'date_reported' in df_clean.columns:
+        df_clean['date_reported'] = pd.to_datetime(df_clean['date_reported'], errors='coerce')
+    
+    return df_clean
+
+def final_cleaning(df):
+    """Perform final cleaning and standardization"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    
+    df_clean = df.copy()
+    
+    # Ensure all required columns exist
+    required_columns = [
+        'entity_name', 
+        'total_affected', 
+        'state_residents_affected',
+        'date_reported', 
+        'reporting_state', 
+        'source_link'
+    ]
+    
+    for col in required_columns:
+        if col not in df_clean.columns:
+            df_clean[col] = np.nan
+    
+    # Handle duplicates
+    if not df_clean.empty:
+        df_clean['nan_count'] = df_clean.isna().sum(axis=1)
+        df_clean = df_clean.sort_values(['entity_name', 'date_reported', 'nan_count'])
+        df_clean = df_clean.drop_duplicates(subset=['entity_name', 'date_reported'], keep='first')
+        df_clean = df_clean.drop('nan_count', axis=1)
+    
+    # Standardize dates
+    for date_col in ['date_reported', 'date_breach_occurred', 'date_breach_discovered']:
+        if date_col in df_clean.columns:
+            df_clean[date_col] = pd.to_datetime(df_clean[date_col], errors='coerce')
+    
+    # Standardize numeric columns
+    for num_col in ['total_affected', 'state_residents_affected']:
+        if num_col in df_clean.columns:
+            if df_clean[num_col].dtype == 'object':
+                df_clean[num_col] = parse_counts(df_clean[num_col])
+    
+    # Fill missing date_breach_occurred
+    if 'date_breach_occurred' in df_clean.columns and 'date_breach_discovered' in df_clean.columns:
+        mask = df_clean['date_breach_occurred'].isna() & df_clean['date_breach_discovered'].notna()
+        df_clean.loc[mask, 'date_breach_occurred'] = df_clean.loc[mask, 'date_breach_discovered']
+    
+    # Sort by date reported
+    df_clean = df_clean.sort_values('date_reported', ascending=False)
+    df_clean = df_clean.reset_index(drop=True)
+    
+    return df_clean
+
+
+# Reports with the same entity name and reporting date are one report
+DEDUP_KEYS = ['entity_name', 'date_reported']
+
+def _descending_date_keys(dates):
+    """Report dates as int64 that ascend where the dates descend, for binary search"""
+    return -pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]').view('int64')
+
+def _rows_equal(left, right):
+    """Whether each pair of rows holds the same values, treating missing values as equal"""
+    same = np.ones(len(left), dtype=bool)
+    for col in left.columns:
+        a = left[col].to_numpy(dtype=object)
+        b = right[col].to_numpy(dtype=object)
+        same &= (a == b) | (pd.isna(a) & pd.isna(b))
+    return same
+
+def merge_cleaned(previous, delta):
+    """Upsert new rows into a dataset that has already been through final_cleaning.
+
+    Only the delta rows are cleaned. A delta row with a new (entity_name,
+    date_reported) is added. A row matching an existing one replaces it when
+    it has no more missing values, which is final_cleaning's fewest-NaNs rule
+    with ties going to the newer row. The result keeps final_cleaning's order,
+    newest first. Returns (merged, changes), where changes holds the added and
+    replacing rows and a 'change' column of 'added' or 'changed'.
+    """
+    delta = final_cleaning(delta)
+    if previous is None or previous.empty:
+        return delta, delta.assign(change='added')
+    if delta.empty:
+        return previous, delta.assign(change=pd.Series(dtype=object))
+    
+    # Line the delta up with the stored columns and types so counts and comparisons match
+    columns = list(previous.columns) + [col for col in delta.columns if col not in previous.columns]
+    if len(columns) > len(previous.columns):
+        previous = previous.reindex(columns=columns)
+    delta = delta.reindex(columns=columns)
+    delta['date_reported'] = delta['date_reported'].astype(previous['date_reported'].dtype)
+    
+    # Only stored rows reported on a delta row's date can share its key; find them by binary search
+    dated = int(previous['date_reported'].notna().sum())
+    previous_keys = _descending_date_keys(previous['date_reported'].iloc[:dated])
+    delta_dates = delta['date_reported']
+    delta_keys = _descending_date_keys(delta_dates[delta_dates.notna()].unique())
+    lo = np.searchsorted(previous_keys, delta_keys, side='left')
+    hi = np.searchsorted(previous_keys, delta_keys, side='right')
+    candidates = [np.arange(a, b) for a, b in zip(lo, hi)]
+    if delta_dates.isna().any():
+        candidates.append(np.arange(dated, len(previous)))
+    candidates = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+    
+    pairs = pd.merge(
+        previous.iloc[candidates][DEDUP_KEYS].assign(previous_row=candidates),
+        delta[DEDUP_KEYS].assign(delta_row=np.arange(len(delta))),
+        on=DEDUP_KEYS,
+    )
+    old_rows = previous.iloc[pairs['previous_row']]
+    new_rows = delta.iloc[pairs['delta_row']]
+    wins = new_rows.isna().sum(axis=1).to_numpy() <= old_rows.isna().sum(axis=1).to_numpy()
+    wins &= ~_rows_equal(old_rows, new_rows)
+    replaced = pairs['previous_row'].to_numpy()[wins]
+    
+    added = np.setdiff1d(np.arange(len(delta)), pairs['delta_row'].to_numpy())
+    inserted = np.concatenate([added, pairs['delta_row'].to_numpy()[wins]])
+    change = np.array(['added'] * len(added) + ['changed'] * int(wins.sum()), dtype=object)
+    
+    keep = np.ones(len(previous), dtype=bool)
+    keep[replaced] = False
+    kept = np.flatnonzero(keep)
+    
+    # Slot each new row in before the kept rows of its date, undated rows last
+    kept_dated = int(np.searchsorted(kept, dated))
+    new_dates = delta['date_reported'].iloc[inserted]
+    has_date = new_dates.notna().to_numpy()
+    new_keys = np.full(len(inserted), np.iinfo(np.int64).max)
+    new_keys[has_date] = _descending_date_keys(new_dates[has_date])
+    positions = np.full(len(inserted), len(kept))
+    positions[has_date] = np.searchsorted(previous_keys[kept[:kept_dated]], new_keys[has_date], side='left')
+    # New rows landing in the same gap go newest first too
+    order = np.lexsort((new_keys, positions))
+    inserted, positions, change = inserted[order], positions[order], change[order]
+    
+    # One copy of the stored rows: take them, with the new rows spliced in, from a single concat
+    new_rows = delta.iloc[inserted].astype(previous.dtypes.to_dict(), errors='ignore')
+    rows = np.insert(kept, positions, len(previous) + np.arange(len(inserted)))
+    merged = pd.concat([previous, new_rows], ignore_index=True).take(rows).reset_index(drop=True)
+    return merged, new_rows.assign(change=change).reset_index(drop=True)
+
+# Compact storage
+# Columns with few distinct values, stored once each as categoricals
+CATEGORY_COLUMNS = ['reporting_state_agency', 'source_link', 'entity_name']
+COUNT_COLUMNS = ['total_affected', 'state_residents_affected']
+
+def _compact_count_dtype(values):
+    """Smallest nullable integer type for whole-number counts, or None if they are not whole"""
+    values = values.dropna()
+    if values.empty:
+        return 'UInt8'
+    if not (values == np.floor(values)).all():
+        return None
+    if values.min() >= 0:
+        for dtype in ('UInt8', 'UInt16', 'UInt32'):
+            if values.max() <= np.iinfo(dtype.lower()).max:
+                return dtype
+    return 'Int64'
+
+def compact_breach_frame(df):
+    """Shrink the combined frame: categoricals for repeated text, nullable compact ints for counts"""
+    df_compact = df.copy()
+    
+    for col in CATEGORY_COLUMNS:
+        if col in df_compact.columns and not isinstance(df_compact[col].dtype, pd.CategoricalDtype):
+            df_compact[col] = df_compact[col].astype('category')
+    
+    for col in COUNT_COLUMNS:
+        if col in df_compact.columns:
+            counts = pd.to_numeric(df_compact[col], errors='coerce')
+            dtype = _compact_count_dtype(counts)
+            if dtype is not None:
+                df_compact[col] = counts.astype(dtype)
+    
+    return df_compact
+
+def memory_report(before, after):
+    """Deep memory use per column, in bytes, before and after compaction"""
+    report = pd.DataFrame({
+        'before': before.memory_usage(deep=True, index=False),
+        'after': after.memory_usage(deep=True, index=False),
+    })
+    report.loc['total'] = report.sum()
+    report['ratio'] = (report['before'] / report['after']).round(1)
+    return report
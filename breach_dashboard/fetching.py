@@ -0,0 +1,124 @@
+"""Pooled HTTP fetching, rate limiting and HTML text helpers"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import METRICS
+
+HTTP_HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'}
+
+def make_http_session(pool_size=10):
+    """Create a keep-alive session with a connection pool and retries on server errors"""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+class DeadlineExceeded(TimeoutError):
+    """A source's time is up; raised before starting work that would run past it"""
+
+class CrawlCheckpointed(DeadlineExceeded):
+    """A crawl ran out of time after storing new pages, which the next run carries on from"""
+
+def time_left(deadline, timeout=None):
+    """Seconds until deadline (a time.monotonic() value, or None for no deadline), capped at timeout.
+
+    Raises DeadlineExceeded once the deadline has passed.
+    """
+    if deadline is None:
+        return timeout
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("The source's deadline has passed")
+    return left if timeout is None else min(timeout, left)
+
+class HostRateLimiter:
+    """Space out requests to each host so none gets more than its requests per second"""
+
+    def __init__(self, requests_per_second=None, per_host=None):
+        self.requests_per_second = requests_per_second
+        self.per_host = per_host or {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        rate = self.per_host.get(host, self.requests_per_second)
+        if not rate:
+            return
+        
+        # Reserve the next free slot for this host, then sleep outside the lock
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+def fetch_pages(urls, session=None, max_workers=8, rate_limiter=None, timeout=30, deadline=None):
+    """Fetch URLs concurrently and return ({url: html}, {url: error}).
+
+    URLs not started by the deadline are not fetched and get DeadlineExceeded as their error.
+    """
+    session = session or make_http_session(pool_size=max_workers)
+    pages = {}
+    errors = {}
+    # Worker threads count their responses against the caller's source
+    source = METRICS.current_source()
+    
+    def fetch(url):
+        time_left(deadline)
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+        response = session.get(url, timeout=time_left(deadline, timeout))
+        METRICS.record_response(response, source=source)
+        response.raise_for_status()
+        return response.text
+    
+    with METRICS.span('fetch'), ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-fetch') as executor:
+        futures = {executor.submit(fetch, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                pages[url] = future.result()
+            except Exception as e:
+                errors[url] = e
+    
+    failed = sum(not isinstance(error, DeadlineExceeded) for error in errors.values())
+    if failed:
+        METRICS.incr('http_errors', failed)
+    return pages, errors
+
+# Tags that start a new line in rendered text
+BLOCK_TAGS = (
+    'p', 'div', 'li', 'ul', 'ol', 'tr', 'table', 'dt', 'dd', 'dl',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'header', 'footer',
+)
+
+def html_text_lines(html, element_id=None):
+    """Return the visible text lines of a page, or of one element, similar to Selenium's .text"""
+    root = lxml.html.fromstring(html)
+    if element_id is not None:
+        matches = root.xpath('//*[@id=$element_id]', element_id=element_id)
+        if matches:
+            root = matches[0]
+    
+    lxml.html.etree.strip_elements(root, 'script', 'style', with_tail=False)
+    for br in root.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    for block in root.iter(*BLOCK_TAGS):
+        block.text = '\n' + (block.text or '')
+        block.tail = '\n' + (block.tail or '')
+    
+    # Collapse whitespace within each line and drop blank lines
+    lines = (' '.join(line.split()) for line in root.text_content().split('\n'))
+    return [line for line in lines if line]
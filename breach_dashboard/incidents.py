@@ -0,0 +1,214 @@
+"""Cross-source incident matching: link reports of the same breach made to different agencies"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+INCIDENT_DATE_WINDOW_DAYS = 30
+INCIDENT_NAME_SIMILARITY = 0.75
+BLOCK_KEY_LENGTH = 6
+MAX_BLOCK_SIZE = 50
+NEIGHBORHOOD_WINDOW = 10
+
+LEGAL_SUFFIXES = (
+    'incorporated', 'inc', 'llc', 'llp', 'lllp', 'lp', 'pllc', 'plc', 'pc', 'pa', 'psc',
+    'corporation', 'corp', 'company', 'co', 'limited', 'ltd', 'na', 'fsb',
+)
+
+def normalize_entity_name(series):
+    """Lowercase names without punctuation, a leading 'the', d/b/a clauses or trailing legal suffixes"""
+    names = series.astype(object).where(series.notna(), '').map(str).str.lower()
+    names = names.str.replace(r"\b(d/b/a|dba|aka|f/k/a|fka)\b.*$", '', regex=True)
+    names = names.str.replace('&', ' and ', regex=False)
+    names = names.str.replace(r"[.'’]", '', regex=True)
+    names = names.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+    names = names.str.replace(r'^the\s+', '', regex=True)
+    suffixes = '|'.join(LEGAL_SUFFIXES)
+    names = names.str.replace(rf'(\s+(?:{suffixes}))+$', '', regex=True)
+    return names
+
+def _name_trigrams(name):
+    compact = f"##{name.replace(' ', '')}#"
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+def link_similar_names(names, similarity=INCIDENT_NAME_SIMILARITY, linked=None):
+    """Group near-identical names, returning the index of each name's group representative.
+
+    Only names that share a blocking key (the first or last few letters, or the
+    same words in any order) are compared, so the work grows with the number of
+    names rather than its square. Oversized blocks are compared in sorted order
+    against a few neighbours only.
+
+    linked, the representatives an earlier call returned for the first
+    len(linked) names, marks those names as already grouped: only pairs with a
+    name after them are compared.
+    """
+    known = 0 if linked is None else len(linked)
+    parent = list(range(len(names))) if linked is None else list(linked) + list(range(known, len(names)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # The alphabetically first name represents the group, so ids do not depend on row order
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            if names[root_b] < names[root_a]:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+
+    blocks = {}
+    for i, name in enumerate(names):
+        if not name:
+            continue
+        compact = name.replace(' ', '')
+        for key in ('p:' + compact[:BLOCK_KEY_LENGTH], 's:' + compact[-BLOCK_KEY_LENGTH:],
+                    'w:' + ' '.join(sorted(name.split()))):
+            blocks.setdefault(key, []).append(i)
+
+    trigrams = {}
+
+    def similar(a, b):
+        if a not in trigrams:
+            trigrams[a] = _name_trigrams(names[a])
+        if b not in trigrams:
+            trigrams[b] = _name_trigrams(names[b])
+        grams_a, grams_b = trigrams[a], trigrams[b]
+        return len(grams_a & grams_b) / len(grams_a | grams_b) >= similarity
+
+    for members in blocks.values():
+        # Members are in index order, so a block whose last member is known holds no new pair
+        if len(members) < 2 or members[-1] < known:
+            continue
+        if len(members) <= MAX_BLOCK_SIZE:
+            pairs = ((a, b) for pos, a in enumerate(members) for b in members[pos + 1:])
+        else:
+            members = sorted(members, key=names.__getitem__)
+            pairs = ((a, b) for pos, a in enumerate(members)
+                     for b in members[pos + 1:pos + 1 + NEIGHBORHOOD_WINDOW])
+        for a, b in pairs:
+            if (a >= known or b >= known) and find(a) != find(b) and similar(a, b):
+                union(a, b)
+
+    return np.array([find(i) for i in range(len(names))], dtype=np.int64)
+
+def incident_groups(df, similarity=INCIDENT_NAME_SIMILARITY, known=None):
+    """Return each report's name group and the mapping of normalized names to groups behind it.
+
+    A group is named after its alphabetically first normalized name; a report
+    without a usable name is a group of its own. known, the mapping an earlier
+    call returned, is taken as already linked, so only names new to it are
+    compared.
+    """
+    names = normalize_entity_name(df['entity_name'])
+    known = pd.Series(dtype=object) if known is None else known
+    new_names = pd.Index(names.unique()).difference(known.index, sort=False)
+    all_names = known.index.append(new_names)
+    representative = link_similar_names(list(all_names), similarity, all_names.get_indexer(known.to_numpy()))
+    name_groups = pd.Series(all_names.to_numpy(dtype=object)[representative], index=all_names, dtype=object)
+
+    # Rows without a usable name are never merged
+    group_names = names.map(name_groups).to_numpy(dtype=object)
+    unnamed = group_names == ''
+    group_names[unnamed] = ['row:' + '|'.join(map(str, row)) for row in df.loc[unnamed].itertuples(index=False)]
+    return group_names, name_groups
+
+def _split_incidents(starts, days, missing, agencies, date_window_days):
+    """Mark, in starts, each sorted report that begins a new incident within its name group.
+
+    starts already marks the first report of every group. A report continues
+    the current incident only if it is within date_window_days of that
+    incident's first report and its agency has not reported the incident yet.
+    """
+    days, missing, agencies = days.tolist(), missing.tolist(), agencies.tolist()
+    # Reports alone in their group are always a start, so only longer runs are walked
+    run_starts = np.flatnonzero(starts)
+    run_lengths = np.diff(np.append(run_starts, len(starts)))
+    for run_start, run_length in zip(run_starts[run_lengths > 1].tolist(), run_lengths[run_lengths > 1].tolist()):
+        first_day = days[run_start]
+        seen = {agencies[run_start]}
+        for i in range(run_start + 1, run_start + run_length):
+            agency = agencies[i]
+            if (not missing[i] and days[i] - first_day > date_window_days) or (agency >= 0 and agency in seen):
+                starts[i] = True
+                first_day = days[i]
+                seen = set()
+            seen.add(agency)
+
+def assign_incidents(df, date_window_days=INCIDENT_DATE_WINDOW_DAYS, similarity=INCIDENT_NAME_SIMILARITY,
+                     groups=None):
+    """Add a stable incident_id shared by reports of the same breach across agencies.
+
+    Reports belong to one incident when their normalized names are near-identical,
+    they were made to different agencies, and they come within date_window_days
+    of the incident's first report. A second report to the same agency, or one
+    past the window, starts a new incident: an entity breached twice is two rows.
+    groups, each row's name group from incident_groups, saves linking the names
+    again.
+    """
+    df_incidents = df.copy()
+    if df_incidents.empty:
+        df_incidents['incident_id'] = pd.Series(dtype=object)
+        return df_incidents
+
+    group_names = incident_groups(df, similarity)[0] if groups is None else np.asarray(groups, dtype=object)
+
+    # Within each name group, take reports in date order; undated ones form their own incidents
+    dates = pd.to_datetime(df_incidents['date_reported'], errors='coerce')
+    missing = dates.isna().to_numpy()
+    days = dates.to_numpy('datetime64[D]').astype(np.int64)
+    days[missing] = np.iinfo(np.int64).min
+    group_codes, _ = pd.factorize(group_names)
+    # Agencies are coded alphabetically so the order, and so the ids, do not depend on row order
+    agency_codes, _ = pd.factorize(df_incidents['reporting_state_agency'].astype(object), sort=True)
+    order = np.lexsort((agency_codes, days, group_codes))
+    sorted_groups, sorted_missing = group_codes[order], missing[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (sorted_groups[1:] != sorted_groups[:-1]) | (sorted_missing[1:] != sorted_missing[:-1])
+    _split_incidents(starts, days[order], sorted_missing, agency_codes[order], date_window_days)
+    incident_number = np.cumsum(starts) - 1
+
+    # The id hashes the group name and the incident's first date, so it survives reruns;
+    # incidents of one group starting the same day are numbered in agency order
+    first_rows = order[starts]
+    first_dates = dates.iloc[first_rows].dt.strftime('%Y-%m-%d').fillna('undated').to_numpy()
+    keys = [f"{name}|{date}" for name, date in zip(group_names[first_rows], first_dates)]
+    repeats = pd.Series(keys).groupby(keys).cumcount().to_numpy()
+    keys = [key if repeat == 0 else f"{key}|{repeat}" for key, repeat in zip(keys, repeats)]
+    incident_ids = np.array([hashlib.sha1(key.encode('utf-8')).hexdigest()[:12] for key in keys], dtype=object)
+
+    row_ids = np.empty(len(order), dtype=object)
+    row_ids[order] = incident_ids[incident_number]
+    df_incidents['incident_id'] = row_ids
+    return df_incidents
+
+def merge_incidents(df):
+    """Collapse reports to one row per incident with the list of agencies that reported it"""
+    if 'incident_id' not in df.columns:
+        df = assign_incidents(df)
+    if df.empty:
+        return df.assign(reporting_agencies=pd.Series(dtype=object))
+
+    # The most complete report represents the incident, as in final_cleaning
+    df_merged = df.assign(nan_count=df.isna().sum(axis=1))
+    df_merged = df_merged.sort_values(['incident_id', 'nan_count', 'date_reported'])
+    grouped = df_merged.groupby('incident_id', sort=False)
+    agencies = (
+        df_merged[['incident_id', 'reporting_state_agency']].astype(object).dropna().drop_duplicates()
+        .sort_values(['incident_id', 'reporting_state_agency'])
+        .groupby('incident_id')['reporting_state_agency'].agg(list)
+    )
+
+    df_merged = grouped.head(1).set_index('incident_id')
+    df_merged['date_reported'] = grouped['date_reported'].min()
+    df_merged['total_affected'] = grouped['total_affected'].max()
+    # Each agency reports its own residents, and an incident holds one report per agency
+    df_merged['state_residents_affected'] = grouped['state_residents_affected'].sum(min_count=1)
+    df_merged['reporting_agencies'] = agencies
+    df_merged = df_merged.drop(columns='nan_count').reset_index()
+    df_merged = df_merged.sort_values('date_reported', ascending=False).reset_index(drop=True)
+    return df_merged
+
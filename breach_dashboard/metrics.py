@@ -0,0 +1,161 @@
+"""Timing spans and counters for each pipeline stage and source"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .storage import SourceUnchanged
+
+class PipelineMetrics:
+    """Thread-safe timing spans and counters per stage and source, exported as JSON or Prometheus text"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._spans = {}
+        self._counters = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def current_source(self):
+        return getattr(self._local, 'source', None)
+
+    @contextmanager
+    def source(self, name):
+        """Attribute the spans and counters recorded in this thread to a source"""
+        previous = self.current_source()
+        self._local.source = name
+        try:
+            yield
+        finally:
+            self._local.source = previous
+
+    @contextmanager
+    def span(self, stage, source=None):
+        """Time a block as one run of a stage, counting it as an error if it raises"""
+        source = source or self.current_source()
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except SourceUnchanged:
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                entry = self._spans.setdefault((stage, source), {
+                    'runs': 0, 'errors': 0, 'seconds_total': 0.0, 'seconds_max': 0.0, 'seconds_last': 0.0})
+                entry['runs'] += 1
+                entry['errors'] += failed
+                entry['seconds_total'] += seconds
+                entry['seconds_max'] = max(entry['seconds_max'], seconds)
+                entry['seconds_last'] = seconds
+
+    def incr(self, name, value=1, source=None):
+        """Add to a counter such as rows_parsed, bytes_fetched, http_retries or source_errors"""
+        source = source or self.current_source()
+        with self._lock:
+            self._counters[(name, source)] = self._counters.get((name, source), 0) + value
+
+    def record_response(self, response, source=None):
+        """Count an HTTP response: one request, its body size and any urllib3 retries before it"""
+        self.incr('http_requests', source=source)
+        self.incr('bytes_fetched', len(response.content), source=source)
+        retries = getattr(response.raw, 'retries', None)
+        if retries is not None and retries.history:
+            self.incr('http_retries', len(retries.history), source=source)
+
+    def snapshot(self):
+        """Return every span and counter as plain JSON-ready data"""
+        with self._lock:
+            spans = [{'stage': stage, 'source': source, **entry} for (stage, source), entry in self._spans.items()]
+            counters = [{'name': name, 'source': source, 'value': value}
+                        for (name, source), value in self._counters.items()]
+        return {'started_at': self.started_at, 'written_at': time.time(), 'spans': spans, 'counters': counters}
+
+    def to_prometheus(self, snapshot=None):
+        """Render a snapshot in the Prometheus text exposition format"""
+        return metrics_to_prometheus(snapshot or self.snapshot())
+
+def _prometheus_labels(**labels):
+    pairs = []
+    for key, value in labels.items():
+        if value is not None:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+# (metric name, span field, Prometheus type, help text)
+SPAN_METRICS = [
+    ('breach_stage_runs_total', 'runs', 'counter', 'Times each pipeline stage ran'),
+    ('breach_stage_errors_total', 'errors', 'counter', 'Pipeline stage runs that raised'),
+    ('breach_stage_seconds_total', 'seconds_total', 'counter', 'Seconds spent in each pipeline stage'),
+    ('breach_stage_seconds_max', 'seconds_max', 'gauge', 'Longest single run of each pipeline stage'),
+    ('breach_stage_seconds_last', 'seconds_last', 'gauge', 'Duration of the latest run of each pipeline stage'),
+]
+
+def metrics_to_prometheus(snapshot):
+    """Prometheus text for a PipelineMetrics snapshot"""
+    lines = []
+    for metric, field, kind, help_text in SPAN_METRICS:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        for span in snapshot['spans']:
+            lines.append(f"{metric}{_prometheus_labels(stage=span['stage'], source=span['source'])} {span[field]}")
+    
+    for name in sorted({counter['name'] for counter in snapshot['counters']}):
+        metric = f'breach_{name}_total'
+        lines += [f'# TYPE {metric} counter']
+        for counter in snapshot['counters']:
+            if counter['name'] == name:
+                lines.append(f"{metric}{_prometheus_labels(source=counter['source'])} {counter['value']}")
+    
+    lines += ['# TYPE breach_metrics_start_time_seconds gauge',
+              f"breach_metrics_start_time_seconds {snapshot['started_at']}"]
+    return '\n'.join(lines) + '\n'
+
+METRICS = PipelineMetrics()
+
+class MetricsServer:
+    """Serves METRICS at /metrics (Prometheus text) and /metrics.json from a background thread.
+
+    Only local clients can reach it unless a wider host, such as '0.0.0.0', is given.
+    """
+
+    def __init__(self, port, host='127.0.0.1', metrics=None):
+        metrics = metrics or METRICS
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body, content_type = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,599 @@
+"""Run the source loaders, clean and combine their tables, and keep the snapshot on disk"""
+import datetime
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import (
+    clean_california_data, clean_hawaii_data, clean_hhs_data, clean_maine_data, clean_texas_data,
+    DEDUP_KEYS, clean_washington_data, compact_breach_frame, final_cleaning, memory_report, merge_cleaned,
+)
+from .fetching import CrawlCheckpointed, DeadlineExceeded
+from .incidents import assign_incidents, incident_groups
+from .metrics import METRICS, metrics_to_prometheus
+from .sources import (
+    breach_report_tx, california_db, hawaii_db, hhs_breach_table, maine_breach_table, washington_db,
+)
+from .storage import DATA_DIR, SOURCE_CACHE, FileLock, SourceUnchanged, write_parquet_atomic, write_text_atomic
+
+log = logging.getLogger(__name__)
+
+# Breach sources, in the order they are combined
+BREACH_SOURCES = {
+    'ME': maine_breach_table,
+    'HHS': hhs_breach_table,
+    'TX': breach_report_tx,
+    'WA': washington_db,
+    'HI': hawaii_db,
+    'CA': california_db,
+}
+
+# Sources that keep the reports they fetched and normally fetch only new ones; a full re-crawl fetches them all
+FULL_RECRAWL_SOURCES = {'ME', 'HHS'}
+
+BREACH_CLEANERS = {
+    'ME': clean_maine_data,
+    'HHS': clean_hhs_data,
+    'TX': clean_texas_data,
+    'WA': clean_washington_data,
+    'HI': clean_hawaii_data,
+    'CA': clean_california_data,
+}
+
+# Seconds each source may take, counted from the start of collection
+SOURCE_TIMEOUTS = {
+    'ME': 600,
+    'HHS': 90,
+    # The first full-history crawl; later runs only fetch the newest pages
+    'TX': 900,
+    'WA': 90,
+    'HI': 90,
+    'CA': 90,
+}
+DEFAULT_SOURCE_TIMEOUT = 120
+
+# No refresh waits longer than this for its sources, whatever their own timeouts
+REFRESH_DEADLINE = 900
+
+# Seconds a source that ran past its deadline gets to finish the request or page load it was in
+SOURCE_STOP_GRACE = 60
+
+# Attempts at a failing source within one refresh, doubling the wait from SOURCE_RETRY_BACKOFF seconds
+SOURCE_ATTEMPTS = 3
+SOURCE_RETRY_BACKOFF = 5
+
+# After this many failed refreshes in a row a source is not called again until the cool-down has passed
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 6 * 3600
+
+# Seconds before each source is checked again; HHS and TX post daily, HI only a few times a month
+SOURCE_TTLS = {
+    'ME': 6 * 3600,
+    'HHS': 3600,
+    'TX': 3600,
+    'WA': 6 * 3600,
+    'HI': 24 * 3600,
+    'CA': 3 * 3600,
+}
+DEFAULT_SOURCE_TTL = 3600
+
+# Seconds to wait before retrying a source whose last refresh failed
+SOURCE_RETRY_DELAY = 600
+
+def load_with_retries(name, loader, deadline, attempts=None, backoff=None):
+    """Call a source loader, retrying failures with exponential backoff while the deadline allows.
+
+    The loader is passed the deadline (a time.monotonic() value) and stops
+    its requests there, raising DeadlineExceeded.
+    """
+    attempts = SOURCE_ATTEMPTS if attempts is None else attempts
+    backoff = SOURCE_RETRY_BACKOFF if backoff is None else backoff
+    for attempt in range(1, attempts + 1):
+        try:
+            return loader(deadline=deadline)
+        except (SourceUnchanged, DeadlineExceeded):
+            raise
+        except Exception as e:
+            # Jittered so sources that failed together do not retry together
+            delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            if attempt == attempts or time.monotonic() + delay >= deadline:
+                raise
+            log.warning("Loading %s failed (attempt %d of %d), retrying in %.0fs: %s",
+                        name, attempt, attempts, delay, e)
+            METRICS.incr('source_retries', source=name)
+            time.sleep(delay)
+
+def iter_breach_sources(sources=None, timeouts=None, deadline=REFRESH_DEADLINE):
+    """Run the source loaders concurrently, yielding (name, result, error, seconds) as each one finishes.
+
+    Each source gets its own timeout, and none waits past deadline seconds.
+    Loaders are passed their deadline and stop there; once every source is
+    in, the generator gives those that overran SOURCE_STOP_GRACE seconds to
+    wind down, so a refresh holding REFRESH_LOCK does not release it while
+    one is still scraping. Loader threads are daemons and never keep the
+    process alive.
+    """
+    sources = BREACH_SOURCES if sources is None else sources
+    timeouts = SOURCE_TIMEOUTS if timeouts is None else timeouts
+    if not sources:
+        return
+
+    started = time.monotonic()
+    limits = {name: min(timeouts.get(name, DEFAULT_SOURCE_TIMEOUT), deadline) for name in sources}
+    deadlines = {name: started + limit for name, limit in limits.items()}
+    finished = queue.Queue()
+
+    def run(name, loader):
+        # Everything the loader records is attributed to its source
+        try:
+            with METRICS.source(name), METRICS.span('load'):
+                finished.put((name, load_with_retries(name, loader, deadlines[name]), None))
+        except Exception as e:
+            finished.put((name, None, e))
+    
+    # One thread per source so the slowest source sets the total time
+    threads = {
+        name: threading.Thread(target=run, args=(name, loader), name=f'breach-source-{name}', daemon=True)
+        for name, loader in sources.items()
+    }
+    for thread in threads.values():
+        thread.start()
+    pending = set(sources)
+
+    try:
+        while pending:
+            next_deadline = min(deadlines[name] for name in pending)
+            try:
+                name, result, error = finished.get(timeout=max(0, next_deadline - time.monotonic()))
+            except queue.Empty:
+                name = None
+            now = time.monotonic()
+            if name in pending:
+                pending.discard(name)
+                yield name, result, error, now - started
+            for name in [name for name in pending if deadlines[name] <= now]:
+                pending.discard(name)
+                METRICS.incr('timeouts', source=name)
+                error = TimeoutError(f"{name} source did not finish within {limits[name]} seconds")
+                yield name, None, error, now - started
+    finally:
+        stop_by = time.monotonic() + SOURCE_STOP_GRACE
+        for name, thread in threads.items():
+            thread.join(max(0, stop_by - time.monotonic()))
+            if thread.is_alive():
+                log.warning("%s loader is still running %ds past its deadline", name, SOURCE_STOP_GRACE)
+
+def due_sources():
+    """Names of the sources whose TTL has run out, leaving out those in a circuit cool-down"""
+    return [
+        name for name in BREACH_SOURCES
+        if SOURCE_CACHE.is_due(name, SOURCE_TTLS.get(name, DEFAULT_SOURCE_TTL), SOURCE_RETRY_DELAY)
+        and not SOURCE_CACHE.circuit_open(name)
+    ]
+
+def stream_source_updates(names=None, full_recrawl=False):
+    """Collect and clean the given sources (all by default), yielding each one as soon as it is ready.
+
+    Yields (name, status, cleaned frame, seconds) where status is 'changed',
+    'unchanged', 'partial' (out of time, with progress saved for the next
+    run), 'failed' or 'skipped' (its circuit is open after repeated
+    failures); the frame is the source's latest cleaned data, which for all
+    but changed sources is the last good one stored by an earlier run. With
+    full_recrawl, the FULL_RECRAWL_SOURCES fetch every report again.
+    """
+    names = list(BREACH_SOURCES) if names is None else list(names)
+    
+    # Sources that keep failing are left alone until their cool-down has passed
+    for name in [name for name in names if SOURCE_CACHE.circuit_open(name)]:
+        METRICS.incr('circuit_skips', source=name)
+        names.remove(name)
+        yield name, 'skipped', SOURCE_CACHE.load_frame(name), 0.0
+    loaders = {name: BREACH_SOURCES[name] for name in names}
+    if full_recrawl:
+        for name in FULL_RECRAWL_SOURCES.intersection(loaders):
+            loaders[name] = functools.partial(loaders[name], full_recrawl=True)
+    
+    for name, raw_table, error, seconds in iter_breach_sources(loaders):
+        if isinstance(error, SourceUnchanged):
+            # Unchanged upstream, so the cleaned frame from the last run is still current
+            SOURCE_CACHE.mark_attempted(name, refreshed=True)
+            yield name, 'unchanged', SOURCE_CACHE.load_frame(name), seconds
+            continue
+        if isinstance(error, CrawlCheckpointed):
+            # Still making progress, so a long first crawl never opens the circuit
+            log.warning("%s: %s", name, error)
+            METRICS.incr('partial_crawls', source=name)
+            SOURCE_CACHE.record_progress(name)
+            yield name, 'partial', SOURCE_CACHE.load_frame(name), seconds
+            continue
+        if error is not None:
+            METRICS.incr('source_errors', source=name)
+            log.error("Failed to load %s data: %s", name, error, exc_info=error)
+        if isinstance(raw_table, pd.DataFrame):
+            METRICS.incr('rows_parsed', len(raw_table), source=name)
+        
+        # Clean each table; a cleaner choking on a changed page fails only its own source
+        try:
+            with METRICS.span('clean', name):
+                cleaned = BREACH_CLEANERS[name](raw_table)
+        except Exception:
+            log.exception("Failed to clean %s data", name)
+            cleaned = None
+        if cleaned is None:
+            METRICS.incr('source_failures', source=name)
+            failures = SOURCE_CACHE.record_failure(name, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN)
+            if failures >= CIRCUIT_FAILURE_THRESHOLD:
+                log.warning("%s failed %d times in a row; not calling it for %d seconds",
+                            name, failures, CIRCUIT_COOLDOWN)
+            yield name, 'failed', SOURCE_CACHE.load_frame(name), seconds
+            continue
+        METRICS.incr('rows_cleaned', len(cleaned), source=name)
+        SOURCE_CACHE.commit(name, cleaned)
+        yield name, 'changed', cleaned, seconds
+
+def refresh_sources(names=None, on_source=None, full_recrawl=False):
+    """Collect and clean the given sources and return the names whose data changed.
+
+    on_source, if given, is called with each (name, status, frame, seconds) as it arrives.
+    """
+    changed = []
+    for name, status, frame, seconds in stream_source_updates(names, full_recrawl):
+        if on_source is not None:
+            on_source(name, status, frame, seconds)
+        if status == 'changed':
+            changed.append(name)
+    return changed
+
+def combine_frames(frames, compact=True, incidents=True):
+    """Combine cleaned source frames into the deduplicated dataset, optionally with incidents and compacted"""
+    # Filter out any None values
+    dfs_to_combine = [df for df in frames if df is not None]
+    if not dfs_to_combine:
+        return pd.DataFrame()
+    
+    # Combine all dataframes
+    combined_df = pd.concat(dfs_to_combine, ignore_index=True)
+    
+    # Final cleaning
+    with METRICS.span('final_cleaning'):
+        final_df = final_cleaning(combined_df)
+    
+    if not incidents:
+        return final_df
+    
+    # Link reports of the same breach made to different agencies
+    with METRICS.span('assign_incidents'):
+        final_df = assign_incidents(final_df)
+    
+    if not compact:
+        return final_df
+    with METRICS.span('compact'):
+        return compact_breach_frame(final_df)
+
+# final_cleaning output and the hash of every source row in it, kept so a refresh only cleans new rows
+CLEANED_PATH = os.path.join(DATA_DIR, 'cleaned.parquet')
+CLEANED_ROWS_PATH = os.path.join(DATA_DIR, 'cleaned_rows.parquet')
+
+def _row_hashes(df):
+    if df is None:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def _load_cleaned_state():
+    """The stored final_cleaning output and source row hashes, or (None, None) if missing or out of step"""
+    try:
+        # The hashes are written second, so older hashes mean the last save did not finish
+        if os.path.getmtime(CLEANED_ROWS_PATH) < os.path.getmtime(CLEANED_PATH):
+            return None, None
+        return pd.read_parquet(CLEANED_PATH), pd.read_parquet(CLEANED_ROWS_PATH)
+    except (OSError, ValueError):
+        return None, None
+
+def merge_cleaned_sources():
+    """Bring the stored final_cleaning output up to date with the latest cleaned source frames.
+
+    Only the rows of source frames saved since the last merge that were not
+    there before are cleaned and upserted (see merge_cleaned). Returns
+    (final_df, changes), where changes lists the added and changed rows; if a
+    source dropped rows, or nothing is stored yet, everything is cleaned
+    again and changes is None.
+    """
+    previous, hashes = _load_cleaned_state()
+    deltas = []
+    if previous is not None:
+        stored_at = os.path.getmtime(CLEANED_ROWS_PATH)
+        for name in BREACH_SOURCES:
+            written_at = SOURCE_CACHE.frame_written_at(name)
+            if written_at is None or written_at < stored_at:
+                continue
+            frame = SOURCE_CACHE.load_frame(name)
+            if frame is None:
+                continue
+            new_hashes = _row_hashes(frame)
+            old_hashes = hashes.loc[hashes['source'] == name, 'row_hash'].to_numpy()
+            if not np.isin(old_hashes, new_hashes).all():
+                # Rows were taken down upstream, which an upsert cannot undo
+                log.info("%s dropped rows; cleaning every source again", name)
+                previous = None
+                break
+            deltas.append(frame[~np.isin(new_hashes, old_hashes)])
+            hashes = pd.concat([hashes[hashes['source'] != name],
+                                pd.DataFrame({'source': name, 'row_hash': new_hashes})], ignore_index=True)
+    
+    if previous is None:
+        frames = {name: SOURCE_CACHE.load_frame(name) for name in BREACH_SOURCES}
+        final_df = combine_frames(frames.values(), compact=False, incidents=False)
+        changes = None
+        hashes = pd.concat([pd.DataFrame({'source': name, 'row_hash': _row_hashes(frame)})
+                            for name, frame in frames.items()], ignore_index=True)
+    else:
+        delta = pd.concat(deltas, ignore_index=True) if deltas else pd.DataFrame()
+        final_df, changes = merge_cleaned(previous, delta)
+    
+    if not final_df.empty:
+        # With no new rows only the hashes are rewritten, which still marks the sources as merged
+        if changes is None or not changes.empty:
+            write_parquet_atomic(final_df, CLEANED_PATH)
+        write_parquet_atomic(hashes, CLEANED_ROWS_PATH)
+    return final_df, changes
+
+# The name groups of every normalized entity name, and each row's group and incident, kept so a
+# refresh only matches the groups its new rows touch again
+NAME_GROUPS_PATH = os.path.join(DATA_DIR, 'name_groups.parquet')
+INCIDENTS_PATH = os.path.join(DATA_DIR, 'incidents.parquet')
+
+def _load_incident_state():
+    """The stored name groups and row incidents, or (None, None) if missing or older than the cleaned rows.
+
+    Read it before merge_cleaned_sources, which rewrites the cleaned rows.
+    """
+    try:
+        # Written after the cleaned rows, so an older file belongs to an earlier merge
+        if os.path.getmtime(INCIDENTS_PATH) < os.path.getmtime(CLEANED_ROWS_PATH):
+            return None, None
+        name_groups = pd.read_parquet(NAME_GROUPS_PATH).set_index('name')['group']
+        return name_groups, pd.read_parquet(INCIDENTS_PATH)
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+def assign_merged_incidents(final_df, changes, state=(None, None)):
+    """Add incident ids to merge_cleaned_sources' output, matching only the name groups it changed again.
+
+    state is what _load_incident_state returned before the merge. A name group
+    is matched again when one of its rows was added or changed, or when a new
+    name joined it to another group; every other row keeps its stored
+    incident. With changes None, or nothing stored, every row is matched.
+    Callers must hold REFRESH_LOCK.
+    """
+    known, stored = (None, None) if changes is None else state
+    groups, name_groups = incident_groups(final_df, known=known)
+    if stored is None:
+        df_incidents = assign_incidents(final_df, groups=groups)
+        METRICS.incr('rows_matched', len(final_df))
+    else:
+        previous = final_df[DEDUP_KEYS].merge(stored, on=DEDUP_KEYS, how='left')
+        # Rows without a stored incident are new, so they count as moved too
+        moved = previous['incident_group'].to_numpy(dtype=object) != groups
+        changed = np.zeros(len(final_df), dtype=bool)
+        if not changes.empty:
+            keys = pd.MultiIndex.from_frame(final_df[DEDUP_KEYS])
+            changed = keys.isin(pd.MultiIndex.from_frame(changes[DEDUP_KEYS]))
+        touched = set(groups[moved | changed]) | set(previous['incident_group'][moved].dropna())
+        rematch = pd.Series(groups).isin(touched).to_numpy()
+        incident_ids = previous['incident_id'].to_numpy(dtype=object)
+        if rematch.any():
+            rematched = assign_incidents(final_df[rematch], groups=groups[rematch])
+            incident_ids[rematch] = rematched['incident_id'].to_numpy()
+        df_incidents = final_df.assign(incident_id=incident_ids)
+        METRICS.incr('rows_matched', int(rematch.sum()))
+    
+    write_parquet_atomic(name_groups.rename_axis('name').rename('group').reset_index(), NAME_GROUPS_PATH)
+    write_parquet_atomic(df_incidents[DEDUP_KEYS].assign(incident_group=groups, incident_id=df_incidents['incident_id']),
+                         INCIDENTS_PATH)
+    return df_incidents
+
+def combine_cleaned_sources(incremental=False):
+    """Combine the latest cleaned frame of every source.
+
+    With incremental, final_cleaning's output and the incidents are kept
+    between calls: only new source rows are cleaned into it, and only the name
+    groups they touch are matched again. Callers must hold REFRESH_LOCK.
+    """
+    if not incremental:
+        final_df = combine_frames([SOURCE_CACHE.load_frame(name) for name in BREACH_SOURCES], compact=False)
+    else:
+        incident_state = _load_incident_state()
+        with METRICS.span('final_cleaning'):
+            final_df, changes = merge_cleaned_sources()
+        if changes is not None:
+            counts = changes['change'].value_counts()
+            METRICS.incr('rows_added', int(counts.get('added', 0)))
+            METRICS.incr('rows_changed', int(counts.get('changed', 0)))
+            log.info("Merged %d new and %d changed rows", counts.get('added', 0), counts.get('changed', 0))
+        if not final_df.empty:
+            with METRICS.span('assign_incidents'):
+                final_df = assign_merged_incidents(final_df, changes, incident_state)
+    if final_df.empty:
+        return final_df
+    
+    with METRICS.span('compact'):
+        compact_df = compact_breach_frame(final_df)
+    # Measuring takes a deep pass over both frames, so only when the line will be logged
+    if log.isEnabledFor(logging.INFO):
+        report = memory_report(final_df, compact_df)
+        log.info("Combined frame uses %.1f MiB (%sx smaller than uncompacted)",
+                 report.loc['total', 'after'] / 2**20, report.loc['total', 'ratio'])
+    
+    return compact_df
+
+# Dataset snapshot
+SNAPSHOT_PATH = os.path.join(DATA_DIR, 'breaches.parquet')
+# Dated copies written by the headless collector
+SNAPSHOT_DIR = os.path.join(DATA_DIR, 'snapshots')
+
+def save_snapshot(df, path=SNAPSHOT_PATH):
+    """Write the cleaned dataset to a Parquet snapshot, replacing the old one atomically"""
+    with METRICS.span('save_snapshot'):
+        write_parquet_atomic(df, path)
+
+def dated_snapshot_path(when=None, directory=SNAPSHOT_DIR):
+    """Path of a timestamped snapshot, e.g. snapshots/breaches-20240131-060000.parquet"""
+    when = when or datetime.datetime.now()
+    return os.path.join(directory, f"breaches-{when:%Y%m%d-%H%M%S}.parquet")
+
+def snapshot_time(path=SNAPSHOT_PATH):
+    """Return when the snapshot was written, or None if there is none"""
+    try:
+        return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+    except OSError:
+        return None
+
+# Metrics export
+METRICS_JSON_PATH = os.path.join(DATA_DIR, 'metrics.json')
+# Prometheus text for node_exporter's textfile collector
+METRICS_PROM_PATH = os.path.join(DATA_DIR, 'metrics.prom')
+
+def save_metrics(json_path=METRICS_JSON_PATH, prom_path=METRICS_PROM_PATH):
+    """Write the current metrics as JSON and as Prometheus text"""
+    snapshot = METRICS.snapshot()
+    try:
+        write_text_atomic(json.dumps(snapshot, indent=2), json_path)
+        write_text_atomic(metrics_to_prometheus(snapshot), prom_path)
+    except OSError as e:
+        log.warning("Could not write metrics: %s", e)
+
+def load_metrics(path=METRICS_JSON_PATH):
+    """Return the last saved metrics snapshot, or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# Held while sources are refreshed and the snapshot rebuilt, so replicas sharing DATA_DIR scrape once
+REFRESH_LOCK = FileLock(os.path.join(DATA_DIR, 'refresh.lock'))
+# Seconds to wait for another process's refresh: its sources and their grace to stop, then combining and saving
+REFRESH_LOCK_WAIT = REFRESH_DEADLINE + SOURCE_STOP_GRACE + 300
+
+def refresh_snapshot(path=SNAPSHOT_PATH, sources=None, on_source=None, force=False, lock_timeout=None,
+                     full_recrawl=False):
+    """Refresh the given sources and rebuild the snapshot if any of them changed, or if forced.
+
+    Only one process refreshes at a time. One that had to wait takes the
+    sources the other refreshed meanwhile as they are, reporting them as
+    'shared', and fetches only the rest.
+    """
+    requested_at = time.time()
+    names = list(BREACH_SOURCES) if sources is None else list(sources)
+    lock_timeout = REFRESH_LOCK_WAIT if lock_timeout is None else lock_timeout
+    
+    waited = time.monotonic()
+    with REFRESH_LOCK.hold(lock_timeout) as held:
+        if not held:
+            raise RuntimeError(f"Another refresh ({REFRESH_LOCK.holder()}) is still running; "
+                               "keeping the current snapshot")
+        waited = time.monotonic() - waited
+        if waited > 1:
+            log.info("Waited %.0fs for another process's refresh", waited)
+        
+        for name in [name for name in names if (SOURCE_CACHE.attempted_at(name) or 0) >= requested_at]:
+            METRICS.incr('refreshes_shared', source=name)
+            names.remove(name)
+            if on_source is not None:
+                on_source(name, 'shared', SOURCE_CACHE.load_frame(name), 0.0)
+        
+        changed = refresh_sources(names, on_source=on_source, full_recrawl=full_recrawl)
+        if not changed and not force and snapshot_time(path) is not None:
+            return None
+        
+        df = combine_cleaned_sources(incremental=True)
+        if df.empty:
+            raise RuntimeError("No data was collected; keeping the previous snapshot")
+        save_snapshot(df, path)
+        return df
+
+class SnapshotRefresher:
+    """Runs at most one background snapshot refresh at a time and tracks each source's progress.
+
+    Replicas sharing DATA_DIR each have one, and REFRESH_LOCK lets only one of
+    them scrape at a time; the others keep serving the snapshot on disk.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.last_error = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._progress = {}
+        self._frames = {}
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, sources=None):
+        """Refresh the given sources (all by default) unless a refresh is running; return True if started"""
+        with self._lock:
+            if self.is_running():
+                return False
+            names = list(BREACH_SOURCES) if sources is None else list(sources)
+            self._progress = {name: {'status': 'pending', 'seconds': None} for name in names}
+            self._frames = {}
+            self._thread = threading.Thread(
+                target=self._run, args=(names,), name='snapshot-refresh', daemon=True)
+            self._thread.start()
+            return True
+
+    def progress(self):
+        """Return ({source: {'status', 'seconds'}}, {source: cleaned frame}) for the current refresh
+
+        Frames are dropped once the refresh ends.
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._progress.items()}, dict(self._frames)
+
+    def _record(self, name, status, frame, seconds):
+        with self._lock:
+            self._progress[name] = {'status': status, 'seconds': seconds}
+            if frame is not None:
+                self._frames[name] = frame
+        save_metrics()
+
+    def _run(self, sources):
+        try:
+            with METRICS.span('refresh'):
+                refresh_snapshot(self.path, sources, on_source=self._record)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+            log.exception("Snapshot refresh failed")
+        finally:
+            # The frames only feed a streaming view; the snapshot holds the result now
+            with self._lock:
+                self._frames = {}
+            save_metrics()
+
+def collect(sources=None, force=False, on_source=None, output=None, full_recrawl=False):
+    """Refresh sources without a UI; return the dated snapshot written, or None if nothing changed.
+
+    The combined dataset also replaces SNAPSHOT_PATH, which the dashboard serves.
+    full_recrawl fetches every Maine and HHS report again instead of only new ones.
+    """
+    try:
+        with METRICS.span('collect'):
+            df = refresh_snapshot(SNAPSHOT_PATH, sources, on_source=on_source, force=force,
+                                  full_recrawl=full_recrawl)
+            if df is None:
+                return None
+            path = output or dated_snapshot_path()
+            save_snapshot(df, path)
+            return path
+    finally:
+        save_metrics()
@@ -0,0 +1,149 @@
+"""Read-only indexes over the combined dataset for date-range, agency and entity-name queries"""
+import numpy as np
+import pandas as pd
+
+# Largest code point, so prefix + PREFIX_END sorts after every name starting with prefix
+PREFIX_END = '\U0010ffff'
+
+def _normalize_query(text):
+    return ' '.join(str(text).casefold().split())
+
+def _substring_trigrams(text):
+    """The unpadded trigrams of a search text, as NameIndex indexes names"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class NameIndex:
+    """Prefix and substring search over distinct entity names.
+
+    Names are casefolded with whitespace collapsed. Prefix lookups binary
+    search the sorted names; substring lookups intersect trigram posting
+    lists and confirm the few candidates left.
+    """
+
+    def __init__(self, names):
+        self.names = np.asarray(names, dtype=object)
+        self._sorted_ids = np.argsort(self.names, kind='stable')
+        self._sorted_names = self.names[self._sorted_ids]
+
+        # Slice out the trigrams at each offset, one vectorized pass per offset
+        text = pd.Series(self.names, dtype='str')
+        lengths = text.str.len().to_numpy()
+        trigrams, name_ids = [], []
+        for offset in range(int(lengths.max(initial=0)) - 2):
+            ids = np.flatnonzero(lengths >= offset + 3)
+            trigrams.append(text.iloc[ids].str.slice(offset, offset + 3).to_numpy(dtype=object))
+            name_ids.append(ids)
+        trigrams = np.concatenate(trigrams) if trigrams else np.empty(0, dtype=object)
+        name_ids = np.concatenate(name_ids) if name_ids else np.empty(0, dtype=np.int64)
+
+        # Posting lists in CSR form: the sorted, distinct ids of the names containing each trigram
+        codes, trigrams = pd.factorize(trigrams, sort=True)
+        self._trigrams = pd.Index(trigrams, dtype=object)
+        keys = np.sort(codes.astype(np.int64) * max(len(self.names), 1) + name_ids)
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+        codes, self._postings = np.divmod(keys, max(len(self.names), 1))
+        self._offsets = np.searchsorted(codes, np.arange(len(self._trigrams) + 1))
+
+    def _posting(self, trigram):
+        position = self._trigrams.get_indexer([trigram])[0]
+        if position < 0:
+            return np.empty(0, dtype=np.int64)
+        return self._postings[self._offsets[position]:self._offsets[position + 1]]
+
+    def prefix(self, text):
+        """Ids of the names that start with text"""
+        text = _normalize_query(text)
+        lo = np.searchsorted(self._sorted_names, text, side='left')
+        hi = np.searchsorted(self._sorted_names, text + PREFIX_END, side='left')
+        return np.sort(self._sorted_ids[lo:hi])
+
+    def substring(self, text):
+        """Ids of the names that contain text"""
+        text = _normalize_query(text)
+        if not text:
+            return np.arange(len(self.names))
+        if len(text) < 3:
+            # Too short for a trigram; distinct names are few enough to scan
+            return np.flatnonzero(pd.Series(self.names).str.contains(text, regex=False).to_numpy())
+
+        # Intersect the shortest posting lists first, then confirm the candidates
+        postings = sorted((self._posting(trigram) for trigram in _substring_trigrams(text)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array([i for i in candidates if text in self.names[i]], dtype=np.int64)
+
+class BreachIndex:
+    """Query layer over a combined breach frame, built once per snapshot.
+
+    Queries return row positions, newest first, and only the requested page
+    is taken from the frame, so filtering never copies the whole dataset.
+    """
+
+    def __init__(self, df):
+        self.frame = df
+
+        # Rows with a date, ordered by date, for binary-searched range lookups
+        dates = pd.to_datetime(df['date_reported']).to_numpy(dtype='datetime64[ns]')
+        dated = np.flatnonzero(~np.isnat(dates))
+        order = np.argsort(dates[dated], kind='stable')
+        self._date_rows = dated[order]
+        self._dates = dates[self._date_rows]
+
+        agencies = df['reporting_state_agency'].astype(object)
+        self._agency_codes, self.agencies = pd.factorize(agencies, sort=True)
+
+        # Normalize each distinct raw name once, then merge names that normalize the same
+        raw_codes, raw_names = pd.factorize(df['entity_name'].astype(object), use_na_sentinel=False)
+        normalized = pd.Index(raw_names, dtype=object).fillna('').map(_normalize_query)
+        name_codes, distinct_names = pd.factorize(normalized)
+        self._name_codes = name_codes[raw_codes]
+        self.names = NameIndex(distinct_names)
+
+        if 'incident_id' in df.columns:
+            self._incident_codes = pd.factorize(df['incident_id'].astype(object))[0]
+        else:
+            self._incident_codes = np.arange(len(df))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def date_range(self, start=None, end=None):
+        """Row positions reported from start up to, but not including, end, newest first"""
+        lo = 0 if start is None else np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start), 'ns'), 'left')
+        hi = len(self._dates) if end is None else np.searchsorted(
+            self._dates, np.datetime64(pd.Timestamp(end), 'ns'), 'left')
+        return self._date_rows[lo:hi][::-1]
+
+    def query(self, start=None, end=None, agencies=None, text=None, prefix=False):
+        """Row positions matching every given filter, newest first"""
+        rows = self.date_range(start, end)
+
+        if agencies:
+            wanted = self.agencies.get_indexer(list(agencies))
+            rows = rows[np.isin(self._agency_codes[rows], wanted[wanted >= 0])]
+
+        if text and _normalize_query(text):
+            name_ids = self.names.prefix(text) if prefix else self.names.substring(text)
+            matches = np.zeros(len(self.names.names), dtype=bool)
+            matches[name_ids] = True
+            rows = rows[matches[self._name_codes[rows]]]
+
+        return rows
+
+    def incidents(self, rows):
+        """Incident codes of the given rows, each once, in order of their newest report"""
+        return pd.unique(self._incident_codes[rows])
+
+    def page(self, rows, page=1, page_size=50):
+        """The rows of one page, taken from the frame"""
+        start = (page - 1) * page_size
+        return self.frame.iloc[rows[start:start + page_size]]
+
+    def incident_page(self, rows, page=1, page_size=50):
+        """Every selected report of the incidents on one page, for merging into one row per incident"""
+        start = (page - 1) * page_size
+        shown = self.incidents(rows)[start:start + page_size]
+        return self.frame.iloc[rows[np.isin(self._incident_codes[rows], shown)]]
@@ -0,0 +1,558 @@
+"""Loaders that fetch each source's raw breach table"""
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html import escape as html_escape
+from urllib.parse import urljoin
+
+import lxml.html
+import pandas as pd
+import requests
+from lxml import etree
+
+from .browser import DRIVER_POOL_SIZE, DRIVER_WAIT_TIMEOUT, get_driver_pool
+from .fetching import (
+    CrawlCheckpointed, DeadlineExceeded, HostRateLimiter, fetch_pages, html_text_lines, make_http_session, time_left,
+)
+from .metrics import METRICS
+from .storage import SOURCE_CACHE, HHSReportStore, MaineReportStore, SourceUnchanged, TexasPageStore
+from .tables import TableNotFound, extract_table
+
+log = logging.getLogger(__name__)
+
+def fetch_source_page(url, source=None, session=None, timeout=60, deadline=None):
+    """GET a source page, conditionally when the source is named, raising SourceUnchanged if it has not changed"""
+    session = session or make_http_session(pool_size=1)
+    headers = SOURCE_CACHE.request_headers(source) if source else {}
+    with METRICS.span('fetch', source):
+        response = session.get(url, headers=headers, timeout=time_left(deadline, timeout))
+    METRICS.record_response(response, source=source)
+    if response.status_code == 304:
+        METRICS.incr('not_modified', source=source)
+        raise SourceUnchanged(source)
+    if not response.ok:
+        METRICS.incr('http_errors', source=source)
+    response.raise_for_status()
+    if source:
+        SOURCE_CACHE.check_body(source, response.text, response.headers)
+    return response.text
+
+# How to find each source's table on its page: extract_table() arguments
+SOURCE_TABLES = {
+    'HHS': {'headers': ['Name of Covered Entity', 'Individuals Affected', 'Breach Submission Date']},
+    'TX': {'table_id': 'mycdrs'},
+    'WA': {'headers': ['Organization Name', 'Date Reported']},
+    'HI': {'headers': ['Breached Entity Name', 'Date Notified']},
+    'CA': {'headers': ['Organization Name', 'Reported Date']},
+}
+
+def fetch_table(url, source=None, timeout=30, deadline=None):
+    """Read a page table over plain HTTP, falling back to the browser when the table is missing"""
+    table = SOURCE_TABLES.get(source, {})
+    try:
+        df = extract_table(fetch_source_page(url, source=source, timeout=timeout, deadline=deadline), **table)
+        if source:
+            SOURCE_CACHE.record_fetch_path(source, 'http')
+        return df
+    except (requests.RequestException, ValueError) as e:
+        # extract_table raises TableNotFound, a ValueError, when the page is JS-rendered
+        log.warning("HTTP fetch of %s failed, using the browser: %s", url, e)
+    
+    METRICS.incr('browser_fallbacks', source=source)
+    with get_driver_pool().driver(time_left(deadline, DRIVER_WAIT_TIMEOUT)) as driver, \
+            METRICS.span('navigate', source):
+        time_left(deadline)
+        driver.get(url)
+        page_source = driver.page_source
+    METRICS.incr('bytes_fetched', len(page_source.encode('utf-8')), source=source)
+    if source:
+        SOURCE_CACHE.record_fetch_path(source, 'browser')
+        SOURCE_CACHE.check_body(source, page_source)
+    return extract_table(page_source, **table)
+
+# Where each source is fetched from; the offline benchmarks point these at a local server
+SOURCE_URLS = {
+    'ME': 'https://www.maine.gov/agviewer/content/ag/985235c7-cb95-4be2-8792-a1252b4f8318/list.html',
+    'HHS': 'https://ocrportal.hhs.gov/ocr/breach/breach_report.jsf',
+    'TX': 'https://oag.my.site.com/datasecuritybreachreport/apex/DataSecurityReportsPage',
+    'WA': 'https://www.atg.wa.gov/data-breach-notifications',
+    'HI': 'https://cca.hawaii.gov/ocp/notices/security-breach/#:~:text=Any%20business%20or%20government%20agency,2%28f%29%2C%20Hawaii%20Revised%20Statutes',
+    'CA': 'https://oag.ca.gov/privacy/databreach/list',
+}
+
+# Maine breach function
+MAINE_FETCH_WORKERS = 8
+MAINE_REQUESTS_PER_SECOND = 10
+
+MAINE_COLUMNS = [
+    'Entity Name', 'Total number of persons affected (including residents)', 'Street Address', 'City',
+    'State, or Country if outside the US', 'Zip Code', 'Name', 'Date(s) Breach Occured',
+    'Date Breach Discovered', 'Type of Notification', 'Date(s) of consumer notification',
+    'Copy of notice to affected Maine residents', 'URL'
+]
+
+def maine_report_urls(html, base_url):
+    """Links to individual breach report pages, which are the only links longer than 100 characters"""
+    root = lxml.html.fromstring(html)
+    root.make_links_absolute(base_url)
+    return [href for href in root.xpath('//a/@href') if len(href) > 100]
+
+def parse_maine_detail(html, url):
+    """Parse the 'key: value' lines of a Maine breach report page into a record dict"""
+    data_dict = {'URL': url}  # Initialize dictionary with URL
+    for item in html_text_lines(html, element_id='content'):
+        if ": " in item:
+            key, value = item.split(': ', 1)  # Split on first occurrence of ': '
+            data_dict[key] = value
+    return data_dict
+
+def build_maine_frame(records):
+    """Turn Maine report record dicts into the raw Maine table"""
+    # Convert list of dictionaries to DataFrame
+    df = pd.DataFrame(records)
+    
+    # Ensure specific columns are present and add missing ones if necessary
+    for col in MAINE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None  # Fill missing columns with None values
+
+    # Convert specific columns to numeric and datetime formats
+    df['Total number of persons affected (including residents)'] = pd.to_numeric(
+        df['Total number of persons affected (including residents)'], errors="coerce")
+    df['Date(s) of consumer notification'] = pd.to_datetime(df['Date(s) of consumer notification'], errors='coerce')
+    
+    # Sort by notification date and remove duplicates
+    df = df.sort_values(by="Date(s) of consumer notification", ascending=False).drop_duplicates()
+    
+    return df
+
+def maine_list_urls(full_recrawl=False, deadline=None):
+    """Report URLs from the Maine list page, read over HTTP unless it only renders in the browser"""
+    list_url = SOURCE_URLS['ME']
+    source = None if full_recrawl else 'ME'
+    try:
+        urls = maine_report_urls(fetch_source_page(list_url, source=source, deadline=deadline), list_url)
+        if urls:
+            SOURCE_CACHE.record_fetch_path('ME', 'http')
+            return urls
+        log.warning("No report links in the Maine list page over HTTP, using the browser")
+    except requests.RequestException as e:
+        log.warning("HTTP fetch of the Maine list page failed, using the browser: %s", e)
+    
+    from selenium.webdriver.common.by import By
+    
+    METRICS.incr('browser_fallbacks', source='ME')
+    with get_driver_pool().driver(time_left(deadline, DRIVER_WAIT_TIMEOUT)) as driver, METRICS.span('navigate', 'ME'):
+        time_left(deadline)
+        driver.get(list_url)
+        urls = []
+        
+        # Gather URLs of individual breach report pages
+        for i in driver.find_elements(By.TAG_NAME, 'a'): 
+            if len(str(i.get_attribute("href"))) > 100:
+                urls.append(i.get_attribute("href"))
+        page_source = driver.page_source
+    
+    SOURCE_CACHE.record_fetch_path('ME', 'browser')
+    # Nothing new to fetch when the list page is exactly as last time
+    if source:
+        SOURCE_CACHE.check_body(source, page_source)
+    return urls
+
+def maine_breach_table(max_workers=MAINE_FETCH_WORKERS, requests_per_second=MAINE_REQUESTS_PER_SECOND,
+                       rate_limits=None, full_recrawl=False, store=None, deadline=None):
+    """Load Maine reports, fetching only detail pages not already in the local store"""
+    urls = maine_list_urls(full_recrawl, deadline)
+    
+    # Published reports never change, so only new URLs need fetching unless a full re-crawl is asked for
+    store = store or MaineReportStore()
+    known = set() if full_recrawl else store.known_urls()
+    new_urls = [x for x in dict.fromkeys(urls) if x not in known]
+    
+    # Fetch the detail pages over plain HTTP with bounded concurrency and per-host rate limits
+    rate_limiter = HostRateLimiter(requests_per_second, per_host=rate_limits)
+    pages, errors = fetch_pages(new_urls, max_workers=max_workers, rate_limiter=rate_limiter, deadline=deadline)
+    for url, error in errors.items():
+        if not isinstance(error, DeadlineExceeded):
+            log.warning("Failed to fetch Maine report %s: %s", url, error)
+    if errors:
+        # Leave the list page unrecorded so the failed reports are retried next run
+        SOURCE_CACHE.forget('ME')
+    
+    with METRICS.span('parse', 'ME'):
+        new_records = {x: parse_maine_detail(pages[x], x) for x in new_urls if x in pages}
+    store.save(new_records)
+    unfetched = sum(isinstance(error, DeadlineExceeded) for error in errors.values())
+    if unfetched:
+        error = CrawlCheckpointed if new_records else DeadlineExceeded
+        raise error(f"Out of time with {unfetched} Maine reports left for the next run")
+    
+    # Keep the list page order
+    records = store.load(urls)
+    return build_maine_frame([records[x] for x in urls if x in records])
+
+# Texas breach function
+TEXAS_COLUMNS = [
+    'Entity Name', 'Entity or Individual Address', 'City', 'State',
+    'Zip Code', 'Type of Notification', 'Total number of persons affected (including residents)',
+    'Notice Provided to Consumers (Y/N)', 'Method(s) of Notice to Consumers', 'Date Published at OAG Website'
+]
+TEXAS_REPORTS_URL = 'https://oag.my.site.com/datasecuritybreachreport/apex/DataSecurityReportsPage'
+
+# Rows per table page while crawling; larger pages mean fewer round trips
+TEXAS_PAGE_LENGTH = 100
+TEXAS_CRAWL_WORKERS = DRIVER_POOL_SIZE
+TEXAS_PAGE_TIMEOUT = 30
+TEXAS_PAGE_RETRIES = 2
+
+# The report table is a DataTables table with id mycdrs; these drive it through its API
+_TEXAS_READY_JS = "return !!(window.jQuery && jQuery.fn.dataTable && jQuery.fn.dataTable.isDataTable('#mycdrs'))"
+_TEXAS_INFO_JS = "return jQuery('#mycdrs').DataTable().page.info()"
+# Oldest first by publication date, so new reports land on the last pages whatever the site's default sort
+_TEXAS_LAYOUT_JS = "jQuery('#mycdrs').DataTable().order([[arguments[1], 'asc']]).page.len(arguments[0]).draw()"
+_TEXAS_ORDER_COLUMN = TEXAS_COLUMNS.index('Date Published at OAG Website')
+_TEXAS_PAGE_JS = "jQuery('#mycdrs').DataTable().page(arguments[0]).draw('page')"
+_TEXAS_DRAWN_JS = (
+    "var info = jQuery('#mycdrs').DataTable().page.info();"
+    "return info.page === arguments[0] && info.length === arguments[1]"
+    " && !jQuery('#mycdrs_processing').is(':visible')"
+)
+_TEXAS_TABLE_JS = "return document.getElementById('mycdrs').outerHTML"
+
+def parse_texas_table(html):
+    """Read the Texas report table and give it Maine's column names"""
+    df_tx = extract_table(html, **SOURCE_TABLES['TX'])
+    
+    # Rename columns to match Maine's column names
+    df_tx.columns = TEXAS_COLUMNS
+    
+    # Add URL column with the Texas main URL
+    df_tx['URL'] = TEXAS_REPORTS_URL
+    return df_tx
+
+def texas_pages_to_fetch(records, page_length, stored):
+    """Pages a crawl has to fetch: those not checkpointed, and those that may have changed since.
+
+    _open_texas_table sorts the reports oldest first, so new ones land on the
+    last pages and a page that was full when fetched never changes. A page
+    that was not full is current only if the table still has as many reports.
+    """
+    pages = []
+    for page in range(-(-records // page_length)):
+        if page not in stored:
+            pages.append(page)
+            continue
+        fetched_records, _ = stored[page]
+        if (page + 1) * page_length > fetched_records and fetched_records != records:
+            pages.append(page)
+    return pages
+
+def _open_texas_table(driver, page_length, deadline=None):
+    """Load the report page, wait for its table, sort it oldest first and set the page length; return its page info"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    time_left(deadline)
+    driver.get(SOURCE_URLS['TX'])
+    wait = WebDriverWait(driver, time_left(deadline, TEXAS_PAGE_TIMEOUT))
+    wait.until(lambda d: d.execute_script(_TEXAS_READY_JS))
+    driver.execute_script(_TEXAS_LAYOUT_JS, page_length, _TEXAS_ORDER_COLUMN)
+    wait.until(lambda d: d.execute_script(_TEXAS_DRAWN_JS, 0, page_length))
+    return driver.execute_script(_TEXAS_INFO_JS)
+
+def _read_texas_page(driver, page, page_length, deadline=None):
+    """Show one page of the table and return its rows as lists of plain values"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    timeout = time_left(deadline, TEXAS_PAGE_TIMEOUT)
+    driver.execute_script(_TEXAS_PAGE_JS, page)
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script(_TEXAS_DRAWN_JS, page, page_length))
+    html = driver.execute_script(_TEXAS_TABLE_JS)
+    METRICS.incr('bytes_fetched', len(html.encode('utf-8')))
+    df_page = parse_texas_table(html)[TEXAS_COLUMNS].astype(object)
+    return df_page.where(df_page.notna(), None).values.tolist()
+
+def _crawl_texas_pages(pages, page_length, records, store, deadline=None):
+    """Fetch a run of pages in one browser session, checkpointing each; return the pages not read"""
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    
+    failed = []
+    with METRICS.source('TX'), get_driver_pool().driver(time_left(deadline, DRIVER_WAIT_TIMEOUT)) as driver:
+        with METRICS.span('navigate'):
+            _open_texas_table(driver, page_length, deadline)
+        for i, page in enumerate(pages):
+            try:
+                for attempt in range(TEXAS_PAGE_RETRIES + 1):
+                    try:
+                        with METRICS.span('navigate'):
+                            rows = _read_texas_page(driver, page, page_length, deadline)
+                        store.save_page(page_length, page, records, rows)
+                        METRICS.incr('pages_crawled')
+                        break
+                    except (TimeoutException, WebDriverException) as e:
+                        METRICS.incr('page_retries')
+                        log.warning("Texas page %s failed (attempt %s): %s", page, attempt + 1, e)
+                        try:
+                            # Start the session over; a stuck draw rarely recovers in place
+                            _open_texas_table(driver, page_length, deadline)
+                        except WebDriverException:
+                            pass
+                else:
+                    failed.append(page)
+            except DeadlineExceeded:
+                # Out of time: leave this page and the rest of the run to the next crawl
+                failed += pages[i:]
+                break
+    return failed
+
+def breach_report_tx(workers=TEXAS_CRAWL_WORKERS, page_length=TEXAS_PAGE_LENGTH, store=None, deadline=None):
+    """Crawl every page of the Texas report table across several browser sessions.
+
+    Each page is checkpointed as it arrives, so an interrupted crawl resumes
+    where it stopped, and later runs only re-fetch the newest pages. If the
+    last stored page no longer reads the same, the whole table is crawled again.
+    """
+    store = store or TexasPageStore()
+    with get_driver_pool().driver(time_left(deadline, DRIVER_WAIT_TIMEOUT)) as driver, \
+            METRICS.span('navigate', 'TX'):
+        info = _open_texas_table(driver, page_length, deadline)
+        records = info['recordsTotal']
+        
+        stored = store.load(page_length)
+        known = max((fetched_records for fetched_records, _ in stored.values()), default=0)
+        if records < known:
+            # Reports were removed, so the stored pages no longer line up
+            log.warning("Texas table shrank from %s to %s reports, crawling it again", known, records)
+            store.clear(page_length)
+            stored = {}
+        
+        pages = texas_pages_to_fetch(records, page_length, stored)
+        kept = sorted(set(stored) - set(pages))
+        if kept:
+            # The last page kept must still read the same, or the sort did not hold and nothing stored lines up
+            live_rows, stored_rows = _read_texas_page(driver, kept[-1], page_length, deadline), stored[kept[-1]][1]
+            if json.dumps([live_rows[:1], live_rows[-1:]]) != json.dumps([stored_rows[:1], stored_rows[-1:]]):
+                log.warning("Texas page %s changed since it was stored, crawling the table again", kept[-1])
+                store.clear(page_length)
+                stored = {}
+                pages = texas_pages_to_fetch(records, page_length, stored)
+    
+    if pages:
+        # Contiguous page ranges, one per browser session
+        size = -(-len(pages) // workers)
+        chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+        failed = []
+        with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix='texas-crawl') as executor:
+            futures = {executor.submit(_crawl_texas_pages, chunk, page_length, records, store, deadline): chunk
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    failed += future.result()
+                except Exception as e:
+                    log.warning("Texas crawl of pages %s-%s failed: %s", futures[future][0], futures[future][-1], e)
+                    failed += futures[future]
+        if failed:
+            message = f"{len(failed)} of {len(pages)} Texas pages could not be read; the rest are checkpointed"
+            if len(failed) < len(pages) and deadline is not None and time.monotonic() >= deadline:
+                raise CrawlCheckpointed(message + "; the crawl carries on next run")
+            raise RuntimeError(message + " for the next run")
+        stored = store.load(page_length)
+    
+    rows = [row for page in sorted(stored) for row in stored[page][1]]
+    SOURCE_CACHE.record_fetch_path('TX', 'browser')
+    
+    # Nothing to clean again when the table is exactly as last time
+    SOURCE_CACHE.check_body('TX', json.dumps(rows))
+    df_tx = pd.DataFrame(rows, columns=TEXAS_COLUMNS)
+    df_tx['URL'] = TEXAS_REPORTS_URL
+    return df_tx
+
+# Hawaii Table
+def hawaii_db(deadline=None):
+    return fetch_table(SOURCE_URLS['HI'], source='HI', deadline=deadline)
+
+def washington_db(deadline=None):
+    return fetch_table(SOURCE_URLS['WA'], source='WA', deadline=deadline)
+
+# HHS Table
+# Rows asked for per result page; the portal's own pager offers up to 100
+HHS_PAGE_SIZE = 100
+HHS_PAGE_TIMEOUT = 30
+# Far more pages than the portal has; a crawl that gets this far is stopped rather than left to run on
+HHS_MAX_PAGES = 500
+
+# The portal gives reports no id, so a report is known by who filed it, from where and when
+HHS_KEY_COLUMNS = ['Name of Covered Entity', 'State', 'Breach Submission Date']
+
+# Headers PrimeFaces sends with its partial (AJAX) requests
+HHS_AJAX_HEADERS = {'Faces-Request': 'partial/ajax', 'X-Requested-With': 'XMLHttpRequest'}
+
+class HHSResultPager:
+    """Page reader for the HHS portal's result table, sending the JSF partial requests its own pager sends.
+
+    The portal page is a JSF form holding a PrimeFaces data table. Opening it
+    starts a server-side view and shows the first page; each further page is
+    a POST of the form's fields, view state included, asking the table to
+    render rows first..first+rows.
+    """
+
+    def __init__(self, session, url, timeout=HHS_PAGE_TIMEOUT, deadline=None):
+        self.session = session
+        self.timeout = timeout
+        self.deadline = deadline
+        html = fetch_source_page(url, session=session, timeout=timeout, deadline=deadline)
+        
+        root = lxml.html.fromstring(html)
+        wanted = set(SOURCE_TABLES['HHS']['headers'])
+        for widget in root.xpath("//div[contains(concat(' ', normalize-space(@class), ' '), ' ui-datatable ')][@id]"):
+            columns = [' '.join(th.text_content().split()) for th in widget.xpath('.//thead/tr[1]/th')]
+            forms = widget.xpath('ancestor::form[1]')
+            if wanted <= set(columns) and forms:
+                break
+        else:
+            raise TableNotFound("No paged HHS result table inside a form on the portal page")
+        
+        self.table_id = widget.get('id')
+        self.columns = columns
+        self.action = urljoin(url, forms[0].get('action') or url)
+        self.fields = dict(forms[0].form_values())
+        
+        # The table's widget script holds the rows per page and the total the paginator counts
+        script = ' '.join(root.xpath('//script[contains(., $id)]/text()', id=f'id:"{self.table_id}"'))
+        page_rows = re.search(r'\brows:(\d+)', script)
+        row_count = re.search(r'\browCount:(\d+)', script)
+        self.total = int(row_count.group(1)) if row_count else None
+        
+        # The first page comes with the portal page, unless the table is filled in later
+        if widget.xpath(".//tr[contains(@class, 'ui-datatable-empty-message')]"):
+            self.first_page = []
+        else:
+            self.first_page = _hhs_records(extract_table(html, **SOURCE_TABLES['HHS']))
+        self.first_page_rows = int(page_rows.group(1)) if page_rows else len(self.first_page)
+
+    def read(self, first, rows):
+        """Return the records (column name: value dicts) of the rows from offset first, at most rows of them"""
+        table_id = self.table_id
+        data = {
+            **self.fields,
+            'javax.faces.partial.ajax': 'true',
+            'javax.faces.source': table_id,
+            'javax.faces.partial.execute': table_id,
+            'javax.faces.partial.render': table_id,
+            table_id: table_id,
+            f'{table_id}_pagination': 'true',
+            f'{table_id}_first': str(first),
+            f'{table_id}_rows': str(rows),
+            f'{table_id}_encodeFeature': 'true',
+        }
+        with METRICS.span('fetch'):
+            response = self.session.post(self.action, data=data, headers=HHS_AJAX_HEADERS,
+                                         timeout=time_left(self.deadline, self.timeout))
+        METRICS.record_response(response)
+        if not response.ok:
+            METRICS.incr('http_errors')
+        response.raise_for_status()
+        
+        try:
+            partial = etree.fromstring(response.content)
+        except etree.XMLSyntaxError as e:
+            raise ValueError(f"HHS portal sent no partial response for rows from {first}: {e}") from e
+        error = partial.find('.//error')
+        if error is not None:
+            # Most often a ViewExpiredException once the server has dropped the session
+            raise ValueError(f"HHS portal error: {error.findtext('error-name')}: {error.findtext('error-message')}")
+        
+        body = None
+        for update in partial.iter('update'):
+            if update.get('id') == table_id:
+                body = update.text or ''
+            elif 'javax.faces.ViewState' in (update.get('id') or ''):
+                self.fields['javax.faces.ViewState'] = update.text
+        if body is None:
+            raise TableNotFound(f"HHS portal response has no rows for table {table_id}")
+        if 'ui-datatable-empty-message' in body:
+            return []
+        
+        # The update holds only the <tr> rows; give them the table's header to read them like the page
+        head = ''.join(f'<th>{html_escape(column)}</th>' for column in self.columns)
+        return _hhs_records(extract_table(f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>',
+                                          **SOURCE_TABLES['HHS']))
+
+def _hhs_records(df):
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict('records')
+
+def hhs_report_key(record):
+    return json.dumps([record.get(column) for column in HHS_KEY_COLUMNS])
+
+def hhs_breach_table(page_size=HHS_PAGE_SIZE, full_recrawl=False, store=None, deadline=None):
+    """Load HHS portal reports, paging through the result table only as far as reports not already stored.
+
+    The portal lists the newest submissions first, so once a crawl has read
+    every page, later runs stop at the first page with nothing new on it.
+    Each page is stored as it arrives, with the offset reached, so a crawl cut
+    short carries on from there next run, past the reports added on top since.
+    A crawl ends at a short page, at the paginator's row count, or when the
+    portal sends the same page twice, and gives up after HHS_MAX_PAGES pages.
+    Reports the portal drops from its list stay in the store.
+    """
+    store = store or HHSReportStore()
+    if full_recrawl:
+        store.reset_crawl()
+    resume, complete = store.crawl_state()
+    known = set() if full_recrawl else store.known_keys()
+    
+    pager = HHSResultPager(make_http_session(pool_size=1), SOURCE_URLS['HHS'], deadline=deadline)
+    records, requested = (pager.first_page, pager.first_page_rows) if pager.first_page else (None, page_size)
+    offset = added = 0
+    previous = None
+    for _ in range(HHS_MAX_PAGES):
+        if records is None:
+            try:
+                records, requested = pager.read(offset, page_size), page_size
+            except DeadlineExceeded as e:
+                if not added:
+                    raise
+                raise CrawlCheckpointed(f"Out of time after storing {added} new HHS reports; "
+                                        "the crawl carries on next run") from e
+        METRICS.incr('pages_crawled')
+        page = {hhs_report_key(record): record for record in records}
+        # Asked for rows past its end, the portal may send its last page again
+        repeated = bool(page) and page.keys() == previous
+        previous = page.keys()
+        new = page.keys() - known
+        known |= new
+        added += len(new)
+        offset += len(records)
+        
+        if repeated or len(records) < requested or (pager.total is not None and offset >= pager.total):
+            store.save_page(page, None)
+            store.finish_crawl()
+            break
+        # Where a later crawl has to carry on if this one stops after this page
+        store.save_page(page, offset if resume is None else max(offset, resume + added))
+        if not new:
+            if resume is not None:
+                # Caught up with what an unfinished crawl stored; skip to where it stopped
+                offset = max(offset, resume + added)
+                resume = None
+            elif complete:
+                store.finish_crawl()
+                break
+        records = None
+    else:
+        raise RuntimeError(f"Read {HHS_MAX_PAGES} HHS pages without reaching the end; "
+                           "the pages read are stored and the crawl carries on next run")
+    SOURCE_CACHE.record_fetch_path('HHS', 'http')
+    
+    records = store.load()
+    # Nothing to clean again when the stored reports are exactly as last time
+    SOURCE_CACHE.check_body('HHS', json.dumps(records))
+    return pd.DataFrame(records)
+
+# California Table
+def california_db(deadline=None):
+    html = fetch_source_page(SOURCE_URLS['CA'], source='CA', deadline=deadline)
+    return extract_table(html, **SOURCE_TABLES['CA'])
+
@@ -0,0 +1,380 @@
+"""On-disk state: the Maine and HHS report stores, each source's validators and cleaned frame, and the refresh lock"""
+import datetime
+import fcntl
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+DATA_DIR = os.environ.get(
+    'BREACH_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.breach_data'))
+
+class SQLiteStore:
+    """Base of the SQLite stores: a file in DATA_DIR whose SCHEMA statements run when it is opened"""
+
+    FILENAME = None
+    SCHEMA = ()
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, self.FILENAME)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self):
+        # A fresh connection per call keeps the store safe to use from worker threads
+        return sqlite3.connect(self.path, timeout=30)
+
+class MaineReportStore(SQLiteStore):
+    """SQLite store of parsed Maine report records keyed by detail-page URL"""
+
+    FILENAME = 'maine_reports.sqlite'
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS reports ('
+        'url TEXT PRIMARY KEY, record TEXT NOT NULL, fetched_at TEXT NOT NULL)',
+    )
+
+    def known_urls(self):
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute('SELECT url FROM reports')}
+
+    def load(self, urls=None):
+        """Return {url: record} for the given URLs, or for every stored report"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT url, record FROM reports').fetchall()
+        records = {url: json.loads(record) for url, record in rows}
+        if urls is not None:
+            records = {url: records[url] for url in urls if url in records}
+        return records
+
+    def save(self, records):
+        """Insert or replace parsed records, given as {url: record}"""
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO reports (url, record, fetched_at) VALUES (?, ?, ?)',
+                [(url, json.dumps(record), fetched_at) for url, record in records.items()]
+            )
+
+
+class TexasPageStore(SQLiteStore):
+    """SQLite checkpoints of crawled Texas table pages, so an interrupted crawl resumes where it stopped"""
+
+    FILENAME = 'texas_pages.sqlite'
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS pages ('
+        'page_length INTEGER NOT NULL, page INTEGER NOT NULL, records INTEGER NOT NULL, '
+        'rows TEXT NOT NULL, fetched_at TEXT NOT NULL, PRIMARY KEY (page_length, page))',
+    )
+
+    def load(self, page_length):
+        """Return {page number: (records in the table when fetched, list of row lists)}"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT page, records, rows FROM pages WHERE page_length = ?', (page_length,)).fetchall()
+        return {page: (records, json.loads(page_rows)) for page, records, page_rows in rows}
+
+    def save_page(self, page_length, page, records, rows):
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO pages (page_length, page, records, rows, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (page_length, page, records, json.dumps(rows), fetched_at)
+            )
+
+    def clear(self, page_length):
+        """Forget every page of this length, forcing a full re-crawl"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM pages WHERE page_length = ?', (page_length,))
+
+class HHSReportStore(SQLiteStore):
+    """SQLite store of HHS breach portal reports, with how far the last crawl of the result pages got"""
+
+    FILENAME = 'hhs_reports.sqlite'
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS reports ('
+        'key TEXT PRIMARY KEY, record TEXT NOT NULL, fetched_at TEXT NOT NULL)',
+        # One row: the offset to resume from when the last crawl stopped partway (else NULL),
+        # and whether a crawl has reached the last page since the store was started or reset
+        'CREATE TABLE IF NOT EXISTS crawl ('
+        'id INTEGER PRIMARY KEY CHECK (id = 0), resume_offset INTEGER, complete INTEGER NOT NULL)',
+        'INSERT OR IGNORE INTO crawl (id, resume_offset, complete) VALUES (0, NULL, 0)',
+    )
+
+    def known_keys(self):
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute('SELECT key FROM reports')}
+
+    def load(self):
+        """Return every stored record, in key order"""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT record FROM reports ORDER BY key').fetchall()
+        return [json.loads(record) for record, in rows]
+
+    def crawl_state(self):
+        """Return (offset to resume from, or None, and whether a crawl has ever reached the last page)"""
+        with self._connect() as conn:
+            resume_offset, complete = conn.execute('SELECT resume_offset, complete FROM crawl').fetchone()
+        return resume_offset, bool(complete)
+
+    def save_page(self, records, resume_offset):
+        """Insert or replace one page's records, given as {key: record}, and where to resume after it"""
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO reports (key, record, fetched_at) VALUES (?, ?, ?)',
+                [(key, json.dumps(record), fetched_at) for key, record in records.items()]
+            )
+            conn.execute('UPDATE crawl SET resume_offset = ?', (resume_offset,))
+
+    def finish_crawl(self):
+        """Record that every page not yet stored has been read"""
+        with self._connect() as conn:
+            conn.execute('UPDATE crawl SET resume_offset = NULL, complete = 1')
+
+    def reset_crawl(self):
+        """Forget crawl progress, so the next crawls read every page again; stored records are kept"""
+        with self._connect() as conn:
+            conn.execute('UPDATE crawl SET resume_offset = NULL, complete = 0')
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temporary path to write, then move it over path, so other processes never read a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def write_text_atomic(text, path):
+    """Write text to a file, replacing any existing file atomically"""
+    with atomic_path(path) as tmp_path, open(tmp_path, 'w') as f:
+        f.write(text)
+
+def write_parquet_atomic(df, path):
+    """Write a frame to Parquet, replacing any existing file atomically"""
+    df = df.copy()
+    
+    # Parquet needs one type per column, so store any mixed text values as strings
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    
+    with atomic_path(path) as tmp_path:
+        df.to_parquet(tmp_path, index=False)
+
+class FileLock:
+    """Exclusive lock shared by every process using the data directory.
+
+    Built on flock(), so the lock is released when its holder exits, even if
+    it crashes, and threads of one process exclude each other too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def hold(self, timeout=None, poll_seconds=0.5):
+        """Yield True once the lock is held, or False if timeout seconds pass first"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with open(self.path, 'a+') as f:
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(poll_seconds)
+            try:
+                # Note the holder, for anyone wondering who has the lock
+                f.seek(0)
+                f.truncate()
+                f.write(f"{os.getpid()} {datetime.datetime.now().isoformat(timespec='seconds')}\n")
+                f.flush()
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def holder(self):
+        """The pid and start time the last holder wrote, or None"""
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+class SourceUnchanged(Exception):
+    """Raised by a loader when its source has not changed since the last cleaned frame was saved"""
+
+class SourceCache:
+    """Per-source HTTP validators, body hashes and last cleaned frames, kept on disk"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(DATA_DIR, 'sources')
+        self._pending = {}
+        self._fetch_paths = {}
+        self._lock = threading.Lock()
+
+    def _state_path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _frame_path(self, name):
+        return os.path.join(self.directory, f"{name}.parquet")
+
+    def _read_state(self, name):
+        try:
+            with open(self._state_path(name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, name, state):
+        write_text_atomic(json.dumps(state), self._state_path(name))
+
+    def state(self, name):
+        """Return the saved validators for a source, or {} if it has no cleaned frame yet"""
+        if not os.path.exists(self._frame_path(name)):
+            return {}
+        return self._read_state(name)
+
+    def refreshed_at(self, name):
+        """When the source was last confirmed current, as a Unix timestamp, or None"""
+        if not os.path.exists(self._frame_path(name)):
+            return None
+        return self._read_state(name).get('refreshed_at')
+
+    def frame_written_at(self, name):
+        """When the source's cleaned frame was last saved, as a Unix timestamp, or None"""
+        try:
+            return os.path.getmtime(self._frame_path(name))
+        except OSError:
+            return None
+
+    def attempted_at(self, name):
+        """When the source was last tried, successfully or not, as a Unix timestamp, or None"""
+        return self._read_state(name).get('attempted_at')
+
+    def is_due(self, name, ttl, retry_delay):
+        """True when the source is older than its TTL and was not just attempted"""
+        state = self._read_state(name)
+        now = time.time()
+        if state.get('attempted_at') and now - state['attempted_at'] < retry_delay:
+            return False
+        refreshed_at = self.refreshed_at(name)
+        return refreshed_at is None or now - refreshed_at > ttl
+
+    def mark_attempted(self, name, refreshed=False):
+        """Record a refresh attempt, and whether it confirmed the stored frame is current"""
+        state = self._read_state(name)
+        state['attempted_at'] = time.time()
+        fetch_path = self._take_fetch_path(name)
+        if refreshed:
+            state['refreshed_at'] = state['attempted_at']
+            state.pop('failures', None)
+            state.pop('open_until', None)
+            if fetch_path:
+                state['fetch_path'] = fetch_path
+        self._write_state(name, state)
+
+    def record_failure(self, name, threshold, cooldown):
+        """Record a failed refresh; return the failures in a row, opening the circuit at threshold"""
+        state = self._read_state(name)
+        state['attempted_at'] = time.time()
+        state['failures'] = state.get('failures', 0) + 1
+        self._take_fetch_path(name)
+        if state['failures'] >= threshold:
+            state['open_until'] = state['attempted_at'] + cooldown
+        self._write_state(name, state)
+        return state['failures']
+
+    def record_progress(self, name):
+        """Record a refresh that ran out of time after storing progress; it clears the failures in a row"""
+        state = self._read_state(name)
+        state['attempted_at'] = time.time()
+        state.pop('failures', None)
+        state.pop('open_until', None)
+        self._take_fetch_path(name)
+        self._write_state(name, state)
+
+    def failures(self, name):
+        """Return (failed refreshes in a row, Unix time the open circuit closes or None)"""
+        state = self._read_state(name)
+        return state.get('failures', 0), state.get('open_until')
+
+    def circuit_open(self, name):
+        """True while a source that kept failing is in its cool-down"""
+        return (self._read_state(name).get('open_until') or 0) > time.time()
+
+    def request_headers(self, name):
+        """Conditional request headers built from the last response for this source"""
+        state = self.state(name)
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def check_body(self, name, body, headers=None):
+        """Raise SourceUnchanged if the body matches the last one, otherwise remember it until commit"""
+        body_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        if self.state(name).get('body_hash') == body_hash:
+            raise SourceUnchanged(name)
+        
+        headers = headers or {}
+        with self._lock:
+            self._pending[name] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'body_hash': body_hash,
+            }
+
+    def record_fetch_path(self, name, fetch_path):
+        """Note whether this refresh read the source over 'http' or in the 'browser'; saved with its outcome"""
+        with self._lock:
+            self._fetch_paths[name] = fetch_path
+
+    def _take_fetch_path(self, name):
+        with self._lock:
+            return self._fetch_paths.pop(name, None)
+
+    def fetch_path(self, name):
+        """How the source was read the last time it refreshed: 'http', 'browser' or None"""
+        return self._read_state(name).get('fetch_path')
+
+    def forget(self, name):
+        """Drop the pending validators so the next run parses this source again"""
+        with self._lock:
+            self._pending.pop(name, None)
+
+    def commit(self, name, df):
+        """Save a source's cleaned frame together with the validators of the body it came from"""
+        write_parquet_atomic(df, self._frame_path(name))
+        with self._lock:
+            state = self._pending.pop(name, {})
+        state['attempted_at'] = state['refreshed_at'] = time.time()
+        fetch_path = self._take_fetch_path(name) or self._read_state(name).get('fetch_path')
+        if fetch_path:
+            state['fetch_path'] = fetch_path
+        self._write_state(name, state)
+
+    def load_frame(self, name):
+        try:
+            return pd.read_parquet(self._frame_path(name))
+        except (OSError, ValueError):
+            return None
+
+SOURCE_CACHE = SourceCache()
@@ -0,0 +1,238 @@
+"""Streaming extraction of one HTML table into a typed DataFrame.
+
+pd.read_html builds a tree of the whole page and turns every table on it into
+a DataFrame. The source pages hold one table we want, often a large one, so
+extract_table() feeds the page through lxml's pull parser, copies out the text
+of each row of the tables that could match, frees the row as soon as it is
+read and stops once the wanted table is complete.
+
+For a table with one header row and no tables nested in it, as on the
+source pages, cell text, spans, column names, missing values and number
+parsing follow pd.read_html, so the cleaners see the same frame either way.
+Beyond that the two differ: a multi-row header gives read_html a MultiIndex
+but here only its last row with text, and nested tables are counted as they
+close, inner before outer, so position may pick a different one.
+"""
+import re
+
+import pandas as pd
+from lxml import etree
+
+from .metrics import METRICS
+
+# Characters fed to the parser at a time
+CHUNK_SIZE = 1 << 16
+
+# Cell text read as missing, as pd.read_html does by default
+NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+_WHITESPACE = re.compile(r'[\r\n]+|\s{2,}')
+_ROW_SECTIONS = ('thead', 'tbody', 'tfoot', 'table')
+_text_content = etree.XPath('string()')
+# Descendants of a row that change its text: line breaks, styles and maybe-hidden elements
+_special_elements = etree.XPath('.//*[self::br or self::style or @style]')
+
+class TableNotFound(ValueError):
+    """No table on the page matched; a ValueError like pd.read_html's"""
+
+def _hidden(element):
+    return 'display:none' in (element.get('style') or '').replace(' ', '')
+
+def _drop_tree(element):
+    """Remove an element but keep the text that follows it"""
+    parent = element.getparent()
+    if parent is None:
+        return
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + element.tail
+        else:
+            parent.text = (parent.text or '') + element.tail
+    parent.remove(element)
+
+def _row_cells(row):
+    """(text, rowspan, colspan, is_th) for each cell of a <tr>, skipping hidden content"""
+    for element in _special_elements(row):
+        if element.tag == 'br':
+            element.tail = '\n' + (element.tail or '')
+        elif element.tag == 'style' or _hidden(element):
+            _drop_tree(element)
+
+    cells = []
+    for cell in row:
+        if cell.tag != 'td' and cell.tag != 'th':
+            continue
+        # Most cells hold only text, which is much cheaper to read than through XPath
+        text = (cell.text or '') if not len(cell) else _text_content(cell)
+        text = text.strip()
+        if '  ' in text or '\n' in text or '\r' in text or '\t' in text:
+            text = _WHITESPACE.sub(' ', text)
+        rowspan = colspan = 1
+        if cell.attrib:
+            rowspan, colspan = _span(cell, 'rowspan'), _span(cell, 'colspan')
+        cells.append((text, rowspan, colspan, cell.tag == 'th'))
+    return cells
+
+def _span(cell, attribute):
+    try:
+        return max(int(cell.get(attribute) or 1), 1)
+    except ValueError:
+        return 1
+
+class _TableState:
+    """Rows collected so far from one <table>"""
+
+    def __init__(self):
+        self.header_rows = []
+        self.rows = []
+        self.footer_rows = []
+        self.remainder = []
+        self.has_text = False
+        self.skip = False
+
+    def add_row(self, section, cells):
+        texts = self._expand(cells)
+        self.has_text = self.has_text or any(texts)
+        if section == 'thead':
+            self.header_rows.append(texts)
+        elif section == 'tfoot':
+            self.footer_rows.append(texts)
+        elif not self.rows and all(is_th for *_, is_th in cells):
+            # Without a <thead>, leading rows of only <th> cells are the header
+            self.header_rows.append(texts)
+        else:
+            self.rows.append(texts)
+
+    def _expand(self, cells):
+        """Repeat each cell over its colspan, and carry rowspans down into the next rows"""
+        texts = []
+        remainder = []
+        for text, rowspan, colspan, _ in cells:
+            while self.remainder and self.remainder[0][0] <= len(texts):
+                _, carried, rows_left = self.remainder.pop(0)
+                if rows_left > 1:
+                    remainder.append((len(texts), carried, rows_left - 1))
+                texts.append(carried)
+            for _ in range(colspan):
+                if rowspan > 1:
+                    remainder.append((len(texts), text, rowspan - 1))
+                texts.append(text)
+        for _, carried, rows_left in self.remainder:
+            if rows_left > 1:
+                remainder.append((len(texts), carried, rows_left - 1))
+            texts.append(carried)
+        self.remainder = remainder
+        return texts
+
+    def header(self):
+        """Column names from the last header row with any text, or None"""
+        for row in reversed(self.header_rows):
+            if any(row):
+                return row
+        return None
+
+    def frame(self):
+        rows = self.rows + self.footer_rows
+        header = self.header()
+        width = max([len(row) for row in rows] + [len(header or ())])
+        if header is None:
+            columns = list(range(width))
+        else:
+            columns = _column_names(header + [''] * (width - len(header)))
+        data = {}
+        for i, name in enumerate(columns):
+            data[name] = _typed_column([row[i] if i < len(row) else '' for row in rows])
+        return pd.DataFrame(data, columns=columns)
+
+def _column_names(header):
+    """Name blank columns and number repeated ones like pd.read_html does for a one-row header"""
+    names = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = name or f'Unnamed: {i}'
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _typed_column(values):
+    """Numbers (with thousands separators) as int64 or float64 and the rest as strings, missing as NaN"""
+    column = pd.Series(values, dtype=object)
+    column = column.mask(column.isin(NA_STRINGS))
+    present = column.dropna()
+    if present.empty:
+        return column.astype('float64')
+
+    numbers = pd.to_numeric(present.str.replace(',', '', regex=False), errors='coerce')
+    if numbers.notna().all():
+        if len(present) == len(column) and (numbers % 1 == 0).all():
+            return numbers.astype('int64')
+        return numbers.reindex(column.index).astype('float64')
+    return column.infer_objects()
+
+def _matches(header, headers):
+    return set(headers) <= set(header or ())
+
+def extract_table(html, table_id=None, headers=None, position=0):
+    """Return one table of an HTML page as a DataFrame.
+
+    The table is the one whose id is table_id, whose column names include
+    every one of headers, or both; position picks among several matches,
+    counting only tables with some text. Column names come from the last
+    header row with text. Both match pd.read_html only for tables without
+    multi-row headers or nested tables (see the module docstring). Raises
+    TableNotFound when no table matches.
+    """
+    with METRICS.span('parse'):
+        return _extract(html, table_id, headers or (), position)
+
+def _extract(html, table_id, headers, position):
+    parser = etree.HTMLPullParser(events=('start', 'end'), tag=('table', 'tr'))
+    tables = {}
+    matched = 0
+
+    for start in range(0, max(len(html), 1), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if element.tag == 'tr':
+                if event == 'end':
+                    _add_row(tables, element, headers)
+            elif event == 'start':
+                if not _hidden(element) and (table_id is None or element.get('id') == table_id):
+                    tables[element] = _TableState()
+            else:
+                table = tables.pop(element, None)
+                if table is not None and table.has_text and not table.skip:
+                    if _matches(table.header(), headers):
+                        if matched == position:
+                            return table.frame()
+                        matched += 1
+                # Free the finished table, unless an outer table's cell still has to read it
+                if next(element.iterancestors('table'), None) is None:
+                    element.clear()
+    parser.close()
+    raise TableNotFound(f"No table found with id={table_id!r} headers={list(headers)!r} position={position}")
+
+def _add_row(tables, row, headers):
+    section = None
+    for ancestor in row.iterancestors(*_ROW_SECTIONS):
+        if ancestor.tag != 'table':
+            section = section or ancestor.tag
+            continue
+        table = tables.get(ancestor)
+        if table is not None and not table.skip and not _hidden(row):
+            table.add_row(section, _row_cells(row))
+            # Once the body starts the header is known; stop collecting tables without the wanted columns
+            if headers and len(table.rows) == 1 and not _matches(table.header(), headers):
+                table.skip = True
+        break
+    # The row's text is copied out, so free it, unless it sits in a cell an outer row still has to read
+    if next(row.iterancestors('tr'), None) is None:
+        row.getparent().remove(row)
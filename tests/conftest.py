@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# DATA_DIR is read when the package is imported, so keep the tests away from the real data store
+os.environ.setdefault('BREACH_DATA_DIR', tempfile.mkdtemp(prefix='breach-test-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
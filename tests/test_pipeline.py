@@ -0,0 +1,41 @@
+import pytest
+
+from breach_dashboard import pipeline
+from breach_dashboard.fetching import CrawlCheckpointed, DeadlineExceeded
+from breach_dashboard.storage import SourceCache, TexasPageStore
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = SourceCache(str(tmp_path / 'sources'))
+    monkeypatch.setattr(pipeline, 'SOURCE_CACHE', cache)
+    return cache
+
+def test_deadline_after_saved_pages_keeps_circuit_closed(tmp_path, monkeypatch, cache):
+    store = TexasPageStore(str(tmp_path / 'texas_pages.sqlite'))
+
+    def loader(deadline=None):
+        # Checkpoint one more page each run, then run out of time
+        page = len(store.load(10))
+        store.save_page(10, page, 1000, [[page]])
+        raise CrawlCheckpointed("out of time")
+
+    monkeypatch.setitem(pipeline.BREACH_SOURCES, 'TX', loader)
+    runs = pipeline.CIRCUIT_FAILURE_THRESHOLD + 1
+    for _ in range(runs):
+        statuses = [status for _, status, _, _ in pipeline.stream_source_updates(['TX'])]
+        assert statuses == ['partial']
+
+    assert len(store.load(10)) == runs
+    assert cache.failures('TX') == (0, None)
+    assert not cache.circuit_open('TX')
+
+def test_deadline_without_progress_opens_circuit(monkeypatch, cache):
+    def loader(deadline=None):
+        raise DeadlineExceeded("out of time")
+
+    monkeypatch.setitem(pipeline.BREACH_SOURCES, 'TX', loader)
+    for _ in range(pipeline.CIRCUIT_FAILURE_THRESHOLD):
+        statuses = [status for _, status, _, _ in pipeline.stream_source_updates(['TX'])]
+        assert statuses == ['failed']
+
+    assert cache.circuit_open('TX')